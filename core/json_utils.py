@@ -0,0 +1,127 @@
+"""
+JSON helpers for Abhikarta
+Uses orjson when it is installed and falls back to the standard json module
+
+© 2025-2030 Ashutosh Sinha, ajsinha@gmail.com, https://www.github.com/ajsinha/abhikarta
+"""
+
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON from a str or bytes payload"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 JSON bytes
+
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with a 2-space indent
+
+    Returns:
+        Encoded JSON (non-ASCII characters are written as-is)
+    
+    NaN and Infinity are written as null on both paths, so the output is
+    always valid JSON. The orjson and stdlib outputs parse to the same data
+    but are not byte-identical (e.g. orjson writes 1e-7 where json writes
+    1e-07).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            # orjson rejects some inputs the stdlib accepts (non-str keys, huge ints)
+            pass
+    try:
+        return _stdlib_dumps(obj, indent)
+    except ValueError as e:
+        # Non-finite floats are written as null like orjson does; other
+        # errors (e.g. circular references) propagate
+        if 'out of range float' not in str(e).lower():
+            raise
+        return _stdlib_dumps(_finite(obj), indent)
+
+
+def _stdlib_dumps(obj: Any, indent: bool) -> bytes:
+    """Serialize with the json module, rejecting NaN and Infinity"""
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False, allow_nan=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, allow_nan=False).encode('utf-8')
+
+
+def _finite(obj: Any) -> Any:
+    """Copy of obj with NaN and Infinity floats replaced by None"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(item) for item in obj]
+    return obj
+
+
+def write_atomic(path: str, obj: Any, indent: bool = False) -> None:
+    """
+    Write an object as JSON so readers see either the old or the new file
+
+    The data goes to a temporary file next to path, is fsynced, and then
+    renamed over path.
+
+    Args:
+        path: Destination file
+        obj: Object to serialize
+        indent: Pretty-print with a 2-space indent
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(dumps_bytes(obj, indent=indent))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _read_bytes(path: str) -> Union[bytes, OSError]:
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError as e:
+        return e
+
+
+def read_files(paths: List[str], max_workers: int = 8) -> List[Union[bytes, OSError]]:
+    """
+    Read several files concurrently (the GIL is released while waiting on I/O)
+
+    Args:
+        paths: Files to read
+        max_workers: Upper bound on reader threads
+
+    Returns:
+        File contents in the order of paths, with the OSError in place of any
+        file that could not be read
+    """
+    if len(paths) < 2:
+        return [_read_bytes(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+        return list(executor.map(_read_bytes, paths))
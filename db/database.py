@@ -10,6 +10,7 @@ import json
 import os
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from itertools import groupby
 from contextlib import contextmanager
 
 
@@ -103,6 +104,22 @@ class Database:
             cursor.execute(query, tuple(data.values()) + where_params)
             return cursor.rowcount
     
+    def write_batch(self, inserts: List[Tuple[str, Dict[str, Any]]] = (),
+                    updates: List[Tuple[str, Dict[str, Any], str, Tuple]] = ()) -> None:
+        """Apply (table, data) inserts, then (table, data, where, where_params) updates, in one transaction"""
+        placeholder = '?' if self.db_type == 'sqlite' else '%s'
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            # Consecutive rows for the same table and columns share one executemany
+            for (table, columns), rows in groupby(inserts, key=lambda item: (item[0], tuple(item[1]))):
+                query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join([placeholder] * len(columns))})"
+                cursor.executemany(query, [tuple(data.values()) for _, data in rows])
+            for table, data, where, where_params in updates:
+                set_clause = ', '.join([f"{k} = {placeholder}" for k in data.keys()])
+                cursor.execute(f"UPDATE {table} SET {set_clause} WHERE {where}",
+                               tuple(data.values()) + tuple(where_params))
+    
     def delete(self, table: str, where: str, where_params: Tuple = ()) -> int:
         """Delete rows"""
         query = f"DELETE FROM {table} WHERE {where}"
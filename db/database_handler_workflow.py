@@ -10,7 +10,13 @@ from db.database_handler_base import DatabaseHandlerBase
 
 
 class WorkflowHandler(DatabaseHandlerBase):
-    """Handler for workflow-related database operations"""
+    """
+    Handler for workflow-related database operations
+    
+    WorkflowOrchestrator commits node status, workflow status and events in
+    batches from a writer thread, so reads here can lag a running workflow by
+    up to WorkflowOrchestrator.WRITE_BATCH_WINDOW seconds.
+    """
     
     # ==================== Workflow Operations ====================
     
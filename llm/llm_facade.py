@@ -212,6 +212,13 @@ class LLMFacade:
         self.model_config = self.config_manager.get_model_config(self.provider, self.model)
         self.provider_config = self.config_manager.get_provider_config(self.provider)
 
+        # Provider SDK client, created on first use
+        self._anthropic_client = None
+        self._anthropic_api_key = None
+
+        # Per-thread flag: did the last generate() call fall back to the mock?
+        self._call_state = threading.local()
+
         logger.info(f"Initialized LLMFacade: {self.provider}/{self.model}")
 
     def generate(self, prompt: str, **kwargs) -> str:
@@ -223,8 +230,9 @@ class LLMFacade:
             **kwargs: Additional parameters (temperature, max_tokens, etc.)
 
         Returns:
-            Generated text
+            Generated text (mock text if the provider failed; see used_fallback)
         """
+        self._call_state.fell_back = False
         try:
             if self.provider == 'anthropic':
                 return self._anthropic_generate(prompt, **kwargs)
@@ -244,13 +252,19 @@ class LLMFacade:
                 return self._mock_generate(prompt, **kwargs)
             else:
                 logger.warning(f"Unknown provider {self.provider}, falling back to mock")
+                self._call_state.fell_back = True
                 return self._mock_generate(prompt, **kwargs)
 
         except Exception as e:
             logger.error(f"Error generating with {self.provider}: {e}")
             # Fallback to mock
+            self._call_state.fell_back = True
             return self._mock_generate(prompt, **kwargs)
 
+    def used_fallback(self) -> bool:
+        """Whether the last generate() call on this thread returned mock text because the provider failed"""
+        return getattr(self._call_state, 'fell_back', False)
+
     def generate_structured(self, prompt: str, schema: Dict[str, Any], **kwargs) -> Dict[str, Any]:
         """
         Generate structured output (JSON) based on schema
@@ -295,7 +309,11 @@ Return ONLY the JSON, no other text."""
             if not api_key:
                 raise ValueError("Anthropic API key not found")
 
-            client = anthropic.Anthropic(api_key=api_key)
+            # Reuse one client (and its connection pool) per API key
+            client = self._anthropic_client
+            if client is None or self._anthropic_api_key != api_key:
+                client = anthropic.Anthropic(api_key=api_key)
+                self._anthropic_client, self._anthropic_api_key = client, api_key
 
             model_id = self.model_config.get('model_id', 'claude-sonnet-4-5-20250929')
             max_tokens = kwargs.get('max_tokens', 4096)
@@ -186,7 +186,8 @@ elapsed = 0
 
 try:
     while elapsed < max_wait_time:
-        # Get workflow status
+        # Get workflow status (the orchestrator commits status writes in
+        # batches, so this can lag by up to WRITE_BATCH_WINDOW seconds)
         workflow = db_handler.db.fetchone(
             "SELECT * FROM workflows WHERE workflow_id = ?",
             (workflow_id,)
@@ -8,8 +8,29 @@ import os
 import re
 import json
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from tools.base_tool import BaseTool
+from core import json_utils
+
+# Buffer size used when writing assembled documents to disk
+WRITE_BUFFER_SIZE = 1 << 20
+
+# TOC indentation per heading level (index = level - 1)
+_INDENTS = tuple('  ' * i for i in range(6))
+
+# Markdown patterns. Headings are matched across a whole buffer in
+# multiline mode; surrounding whitespace never spans a newline. Link parts are bounded and kept to one line so
+# pathological input cannot trigger runaway backtracking.
+_HEADING_RE = re.compile(r'(?m)^[^\S\n]*(#{1,6})[^\S\n]+(\S[^\n]*?)[^\S\n]*$')
+_LINK_RE = re.compile(r'\[([^\]\n]{1,500})\]\(([^)\n]{1,2000})\)')
+_FENCE_RE = re.compile(r'(?m)^[^\S\n]*```')
+
+# Anchor slugging: drop characters other than word chars, whitespace and
+# hyphens, then collapse whitespace/underscore runs into a single hyphen.
+# ASCII titles use a translate table; others need the Unicode-aware regex.
+_ANCHOR_STRIP_RE = re.compile(r'[^\w\s-]')
+_ANCHOR_STRIP_TABLE = str.maketrans({c: None for c in map(chr, range(128)) if _ANCHOR_STRIP_RE.match(c)})
+_ANCHOR_SEP_RE = re.compile(r'[\s_]+')
 
 
 class DocumentAssemblerTool(BaseTool):
@@ -21,6 +42,8 @@ class DocumentAssemblerTool(BaseTool):
         self.include_toc = config.get('include_toc', True)
         self.include_metadata = config.get('include_metadata', True)
         self.toc_depth = config.get('toc_depth', 3)
+        # Parsed templates keyed by path, invalidated on mtime change
+        self._template_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
     
     def execute(self, action: str, **kwargs) -> Dict[str, Any]:
         """
@@ -53,7 +76,8 @@ class DocumentAssemblerTool(BaseTool):
     
     def _assemble_document(self, sections: Dict[str, Any], metadata: Dict[str, Any] = None,
                           template: Dict[str, Any] = None, template_name: str = None, 
-                          output_path: str = None, debug_dir: str = None, workflow_id: str = None, node_id: str = None) -> Dict[str, Any]:
+                          output_path: str = None, debug_dir: str = None, workflow_id: str = None, node_id: str = None,
+                          return_document: bool = True) -> Dict[str, Any]:
         """
         Assemble complete document from sections
         
@@ -63,6 +87,9 @@ class DocumentAssemblerTool(BaseTool):
             template: Template definition for ordering (optional)
             template_name: Template name to load (optional, alternative to template)
             output_path: Path to write output file (optional)
+            return_document: Include the assembled text in the result (default True).
+                When False and output_path is set, parts are streamed straight to
+                the file without building the full document string.
             
         Returns:
             Dictionary with assembled document
@@ -73,8 +100,7 @@ class DocumentAssemblerTool(BaseTool):
             if not os.path.isabs(candidate_path) and os.sep not in candidate_path:
                 candidate_path = os.path.join('data/templates', f'{template_name}.json')
             if os.path.exists(candidate_path):
-                with open(candidate_path, 'r', encoding='utf-8') as f:
-                    template = json.load(f)
+                template = self._load_template(candidate_path)
         
         document_parts = []
         
@@ -87,50 +113,67 @@ class DocumentAssemblerTool(BaseTool):
         
         # 2. Collect section content in order
         section_content = self._order_sections(sections, template)
-        if debug_dir:
-            try:
-                os.makedirs(debug_dir, exist_ok=True)
-                with open(os.path.join(debug_dir, 'section_order.json'), 'w', encoding='utf-8') as f:
-                    json.dump([s.get('title') for s in section_content], f, indent=2)
-            except Exception:
-                pass
         
-        # 3. Generate table of contents
-        if self.include_toc:
-            toc_result = self._generate_toc(section_content=section_content)
-            if toc_result['success']:
-                document_parts.append('# Table of Contents\n\n')
-                document_parts.append(toc_result['toc'])
-                document_parts.append('\n\n')
-                document_parts.append('---\n\n')
-                if debug_dir:
-                    try:
-                        with open(os.path.join(debug_dir, 'toc.md'), 'w', encoding='utf-8') as f:
-                            f.write(toc_result['toc'])
-                    except Exception:
-                        pass
-        
-        # 4. Add all sections
+        # 3. Emit section bodies, collecting TOC headings in the same pass
+        body_parts = []
+        headings = []
         for section_data in section_content:
             content = section_data.get('content', '')
             if content:
-                document_parts.append(content)
-                document_parts.append('\n\n')
+                if self.include_toc:
+                    headings.extend(self._extract_headings(content))
+                body_parts.append(content)
+                body_parts.append('\n\n')
         
-        # 5. Assemble final document
-        final_document = ''.join(document_parts)
+        # 4. Table of contents precedes the section bodies
+        if self.include_toc:
+            toc = self._build_toc(headings)
+            document_parts.append('# Table of Contents\n\n')
+            document_parts.append(toc)
+            document_parts.append('\n\n')
+            document_parts.append('---\n\n')
+        
+        document_parts.extend(body_parts)
+        
+        # 5. Dump intermediate artifacts in one batch when debugging
         if debug_dir:
+            debug_files = {
+                'section_order.json': [json.dumps([s.get('title') for s in section_content], indent=2)],
+                'assembled.md': document_parts
+            }
+            if self.include_toc:
+                debug_files['toc.md'] = [toc]
+            self._write_debug_files(debug_dir, debug_files)
+        
+        # 6. Stream straight to disk when the caller doesn't need the text back
+        if output_path and not return_document:
             try:
-                with open(os.path.join(debug_dir, 'assembled.md'), 'w', encoding='utf-8') as f:
-                    f.write(final_document)
-            except Exception:
-                pass
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                with open(output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+                    f.writelines(document_parts)
+            except Exception as e:
+                return {
+                    'success': False,
+                    'error': f'Failed to write document: {str(e)}'
+                }
+            
+            return {
+                'success': True,
+                'document': None,
+                'sections_count': len(section_content),
+                'character_count': sum(len(part) for part in document_parts),
+                'word_count': sum(len(part.split()) for part in document_parts),
+                'output_path': output_path
+            }
+        
+        # 7. Assemble final document
+        final_document = ''.join(document_parts)
         
-        # 6. Write to file if path provided
+        # 8. Write to file if path provided
         if output_path:
             try:
                 os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                with open(output_path, 'w', encoding='utf-8') as f:
+                with open(output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
                     f.write(final_document)
             except Exception as e:
                 return {
@@ -140,13 +183,54 @@ class DocumentAssemblerTool(BaseTool):
         
         return {
             'success': True,
-            'document': final_document,
+            'document': final_document if return_document else None,
             'sections_count': len(section_content),
             'character_count': len(final_document),
             'word_count': len(final_document.split()),
             'output_path': output_path
         }
     
+    def _write_debug_files(self, debug_dir: str, files: Dict[str, List[str]]) -> None:
+        """
+        Write debug artifacts with a single directory check; failures are ignored
+        
+        Args:
+            debug_dir: Directory to write into
+            files: Mapping of file name to the string parts making up its content
+        """
+        try:
+            os.makedirs(debug_dir, exist_ok=True)
+        except Exception:
+            return
+        
+        for file_name, parts in files.items():
+            try:
+                with open(os.path.join(debug_dir, file_name), 'w', encoding='utf-8',
+                          buffering=WRITE_BUFFER_SIZE) as f:
+                    f.writelines(parts)
+            except Exception:
+                pass
+    
+    def _load_template(self, template_path: str) -> Dict[str, Any]:
+        """
+        Load a template JSON file, reusing the parsed result while the file is unchanged
+        
+        Args:
+            template_path: Path to template JSON file
+            
+        Returns:
+            Parsed template dictionary
+        """
+        mtime = os.path.getmtime(template_path)
+        cached = self._template_cache.get(template_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        with open(template_path, 'rb') as f:
+            template = json_utils.loads(f.read())
+        self._template_cache[template_path] = (mtime, template)
+        return template
+    
     def _order_sections(self, sections: Dict[str, Any], 
                        template: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
@@ -159,20 +243,13 @@ class DocumentAssemblerTool(BaseTool):
         Returns:
             Ordered list of section data
         """
-        ordered_sections = []
-        
         if template and 'sections' in template:
             # Order by template
-            for section_def in template['sections']:
-                section_id = section_def.get('id')
-                if section_id in sections:
-                    ordered_sections.append(sections[section_id])
-        else:
-            # Natural ordering (by section ID or title)
-            for section_id in sorted(sections.keys()):
-                ordered_sections.append(sections[section_id])
-        
-        return ordered_sections
+            section_ids = (section_def.get('id') for section_def in template['sections'])
+            return [sections[section_id] for section_id in section_ids if section_id in sections]
+        
+        # Natural ordering (by section ID)
+        return [sections[section_id] for section_id in sorted(sections)]
     
     def _generate_toc(self, section_content: List[Dict[str, Any]] = None,
                      markdown_content: str = None) -> Dict[str, Any]:
@@ -189,29 +266,17 @@ class DocumentAssemblerTool(BaseTool):
         try:
             headings = []
             
-            # Extract headings from section content
+            # Extract headings from section content in a single pass over
+            # the joined sections (newline-separated, so no heading spans two)
             if section_content:
-                for section in section_content:
-                    content = section.get('content', '')
-                    headings.extend(self._extract_headings(content))
+                headings = self._extract_headings(
+                    '\n'.join(section.get('content', '') for section in section_content))
             
             # Or extract from raw markdown
             elif markdown_content:
                 headings = self._extract_headings(markdown_content)
             
-            # Build TOC
-            toc_lines = []
-            for heading in headings:
-                level = heading['level']
-                title = heading['title']
-                anchor = heading['anchor']
-                
-                # Only include headings up to toc_depth
-                if level <= self.toc_depth:
-                    indent = '  ' * (level - 1)
-                    toc_lines.append(f"{indent}- [{title}](#{anchor})")
-            
-            toc = '\n'.join(toc_lines)
+            toc = self._build_toc(headings)
             
             return {
             'success': True,
@@ -224,6 +289,24 @@ class DocumentAssemblerTool(BaseTool):
                 'error': f'TOC generation error: {str(e)}'
             }
     
+    def _build_toc(self, headings: List[Dict[str, Any]]) -> str:
+        """
+        Render TOC markdown from extracted headings
+        
+        Args:
+            headings: List of heading dictionaries from _extract_headings
+            
+        Returns:
+            TOC markdown (headings deeper than toc_depth are omitted)
+        """
+        toc_lines = []
+        for heading in headings:
+            level = heading['level']
+            if level <= self.toc_depth:
+                toc_lines.append(f"{_INDENTS[level - 1]}- [{heading['title']}](#{heading['anchor']})")
+        
+        return '\n'.join(toc_lines)
+    
     def _extract_headings(self, content: str) -> List[Dict[str, Any]]:
         """
         Extract markdown headings from content
@@ -236,26 +319,23 @@ class DocumentAssemblerTool(BaseTool):
         """
         headings = []
         
-        # Match markdown headings (## Title or ### Title, etc.)
-        heading_pattern = r'^(#{1,6})\s+(.+)$'
-        
-        for line in content.split('\n'):
-            match = re.match(heading_pattern, line.strip())
-            if match:
-                hashes = match.group(1)
-                title = match.group(2).strip()
-                level = len(hashes)
-                
-                # Generate anchor (lowercase, spaces to hyphens, remove special chars)
-                anchor = re.sub(r'[^\w\s-]', '', title.lower())
-                anchor = re.sub(r'[\s_]+', '-', anchor)
-                anchor = anchor.strip('-')
-                
-                headings.append({
-                    'level': level,
-                    'title': title,
-                    'anchor': anchor
-                })
+        # Match markdown headings (## Title or ### Title, etc.) in one scan
+        for match in _HEADING_RE.finditer(content):
+            hashes, title = match.groups()
+            
+            # Generate anchor (lowercase, spaces to hyphens, remove special chars)
+            anchor = title.lower()
+            if anchor.isascii():
+                anchor = anchor.translate(_ANCHOR_STRIP_TABLE)
+            else:
+                anchor = _ANCHOR_STRIP_RE.sub('', anchor)
+            anchor = _ANCHOR_SEP_RE.sub('-', anchor).strip('-')
+            
+            headings.append({
+                'level': len(hashes),
+                'title': title,
+                'anchor': anchor
+            })
         
         return headings
     
@@ -316,30 +396,23 @@ class DocumentAssemblerTool(BaseTool):
         """
         issues = []
         
-        # Check for common markdown issues
-        lines = content.split('\n')
-        
-        # Check for unclosed code blocks
-        code_block_count = 0
-        for i, line in enumerate(lines, start=1):
-            if line.strip().startswith('```'):
-                code_block_count += 1
+        # Check for unclosed code blocks (fence lines, ignoring leading whitespace)
+        code_block_count = len(_FENCE_RE.findall(content))
         
         if code_block_count % 2 != 0:
             issues.append("Unclosed code block detected")
         
-        # Check for malformed links
-        for i, line in enumerate(lines, start=1):
-            link_pattern = r'\[([^\]]+)\]\(([^)]+)\)'
-            links = re.findall(link_pattern, line)
-            for link_text, link_url in links:
-                if not link_url.strip():
-                    issues.append(f"Line {i}: Empty link URL for '{link_text}'")
+        # Check for malformed links (a link never spans lines)
+        for match in _LINK_RE.finditer(content):
+            link_text, link_url = match.groups()
+            if not link_url.strip():
+                line_number = content.count('\n', 0, match.start()) + 1
+                issues.append(f"Line {line_number}: Empty link URL for '{link_text}'")
         
         return {
             'valid': len(issues) == 0,
             'issues': issues if issues else None,
-            'line_count': len(lines),
+            'line_count': content.count('\n') + 1,
             'character_count': len(content)
         }
     
@@ -356,7 +429,8 @@ class DocumentAssemblerTool(BaseTool):
                         'sections': 'Dictionary mapping section IDs to section data',
                         'metadata': 'Document metadata (optional)',
                         'template': 'Template definition for ordering (optional)',
-                        'output_path': 'Path to write output file (optional)'
+                        'output_path': 'Path to write output file (optional)',
+                        'return_document': 'Include assembled text in result (default: true)'
                     }
                 },
                 {
@@ -5,9 +5,16 @@ Handles file I/O operations for documentation workflow
 © 2025 Model Documentation Integration
 """
 import os
-import json
-from typing import Dict, Any, List
+import stat
+from typing import Dict, Any, List, Iterator
 from tools.base_tool import BaseTool
+from core import json_utils
+
+# Common non-code directories skipped during recursive scans
+_SKIP_DIRS = frozenset({'__pycache__', 'node_modules', 'venv', '.git'})
+
+# Buffer size for file writes
+WRITE_BUFFER_SIZE = 1 << 16
 
 
 class FileSystemTool(BaseTool):
@@ -15,7 +22,7 @@ class FileSystemTool(BaseTool):
     
     def __init__(self, tool_name: str, description: str, config: Dict[str, Any] = None):
         super().__init__(tool_name, description, config)
-        self.allowed_extensions = config.get('allowed_extensions', ['.py', '.js', '.java', '.ts', '.md', '.json'])
+        self.allowed_extensions = frozenset(config.get('allowed_extensions', ['.py', '.js', '.java', '.ts', '.md', '.json']))
         self.max_file_size = config.get('max_file_size', 10 * 1024 * 1024)  # 10MB default
         
     def execute(self, action: str, **kwargs) -> Dict[str, Any]:
@@ -74,42 +81,30 @@ class FileSystemTool(BaseTool):
             }
         
         # Use provided extensions or default to allowed extensions
-        filter_extensions = extensions if extensions else self.allowed_extensions
+        filter_extensions = frozenset(extensions) if extensions else self.allowed_extensions
         
         files = []
         
         if recursive:
-            for root, dirs, filenames in os.walk(path):
-                # Skip hidden directories and common non-code directories
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['__pycache__', 'node_modules', 'venv', '.git']]
-                
-                for filename in filenames:
-                    if filename.startswith('.'):
-                        continue
-                    
-                    file_path = os.path.join(root, filename)
-                    file_ext = os.path.splitext(filename)[1]
-                    
-                    if not filter_extensions or file_ext in filter_extensions:
-                        rel_path = os.path.relpath(file_path, path)
-                        files.append({
-                            'path': file_path,
-                            'relative_path': rel_path,
-                            'name': filename,
-                            'size': os.path.getsize(file_path)
-                        })
+            for entry in self._scan_files(path):
+                if not filter_extensions or os.path.splitext(entry.name)[1] in filter_extensions:
+                    files.append({
+                        'path': entry.path,
+                        'relative_path': os.path.relpath(entry.path, path),
+                        'name': entry.name,
+                        'size': entry.stat().st_size
+                    })
         else:
-            for filename in os.listdir(path):
-                file_path = os.path.join(path, filename)
-                if os.path.isfile(file_path) and not filename.startswith('.'):
-                    file_ext = os.path.splitext(filename)[1]
-                    if not filter_extensions or file_ext in filter_extensions:
-                        files.append({
-                            'path': file_path,
-                            'relative_path': filename,
-                            'name': filename,
-                            'size': os.path.getsize(file_path)
-                        })
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.startswith('.'):
+                        if not filter_extensions or os.path.splitext(entry.name)[1] in filter_extensions:
+                            files.append({
+                                'path': entry.path,
+                                'relative_path': entry.name,
+                                'name': entry.name,
+                                'size': entry.stat().st_size
+                            })
         
         return {
             'success': True,
@@ -118,6 +113,43 @@ class FileSystemTool(BaseTool):
             'scanned_path': path
         }
     
+    def _scan_files(self, path: str) -> Iterator[os.DirEntry]:
+        """
+        Recursively yield visible file entries under a directory
+        
+        Files in a directory are yielded before its subdirectories are
+        descended, matching os.walk's top-down order. Like os.walk,
+        directories that cannot be read are skipped. DirEntry caches its
+        stat result, so callers can read sizes without another syscall.
+        
+        Args:
+            path: Directory path to scan
+            
+        Returns:
+            Iterator of os.DirEntry objects for files
+        """
+        subdirs = []
+        try:
+            it = os.scandir(path)
+        except OSError:
+            return
+        with it:
+            try:
+                for entry in it:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP_DIRS:
+                            subdirs.append(entry.path)
+                    elif entry.is_file():
+                        yield entry
+            except OSError:
+                # Directory became unreadable mid-listing; keep what was seen
+                pass
+        
+        for subdir in subdirs:
+            yield from self._scan_files(subdir)
+    
     def _read_file(self, file_path: str) -> Dict[str, Any]:
         """
         Read file contents
@@ -128,20 +160,22 @@ class FileSystemTool(BaseTool):
         Returns:
             Dictionary with file contents
         """
-        if not os.path.exists(file_path):
+        # One stat() covers the existence, type and size checks
+        try:
+            st = os.stat(file_path)
+        except OSError:
             return {
                 'success': False,
                 'error': f'File does not exist: {file_path}'
             }
         
-        if not os.path.isfile(file_path):
+        if not stat.S_ISREG(st.st_mode):
             return {
                 'success': False,
                 'error': f'Path is not a file: {file_path}'
             }
         
-        # Check file size
-        file_size = os.path.getsize(file_path)
+        file_size = st.st_size
         if file_size > self.max_file_size:
             return {
                 'success': False,
@@ -149,14 +183,19 @@ class FileSystemTool(BaseTool):
             }
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Slurp bytes and decode once rather than going through TextIOWrapper
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            content = raw.decode('utf-8')
+            if '\r' in content:
+                # Keep text-mode universal newline behaviour
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
             
             return {
                 'success': True,
                 'content': content,
                 'file_path': file_path,
-                'size': file_size
+                'size': len(raw)
             }
         except UnicodeDecodeError:
             return {
@@ -184,13 +223,15 @@ class FileSystemTool(BaseTool):
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Encode once; the byte count comes from the same buffer
+            data = content.encode('utf-8')
+            with open(file_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                f.write(data)
             
             return {
                 'success': True,
                 'file_path': file_path,
-                'bytes_written': len(content.encode('utf-8'))
+                'bytes_written': len(data)
             }
         except Exception as e:
             return {
@@ -213,13 +254,15 @@ class FileSystemTool(BaseTool):
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # Serialize up front so the file gets one write and the size is known
+            payload = json_utils.dumps_bytes(data, indent=True)
+            with open(file_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                f.write(payload)
             
             return {
                 'success': True,
                 'file_path': file_path,
-                'bytes_written': os.path.getsize(file_path)
+                'bytes_written': len(payload)
             }
         except Exception as e:
             return {
@@ -5,9 +5,122 @@ Handles code summarization using LLMs (mock or real)
 © 2025 Model Documentation Integration
 """
 import os
-from typing import Dict, Any, List
+import json
+import time
+import asyncio
+import random
+import string
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import cycle, islice
+from typing import Dict, Any, List, Optional, Tuple, Iterator
 from tools.base_tool import BaseTool
 
+try:
+    import httpx
+    from anthropic import Anthropic, AsyncAnthropic
+except ImportError:
+    httpx = None
+    Anthropic = AsyncAnthropic = None
+
+# Map config model names to Anthropic API model ids
+ANTHROPIC_MODEL_MAP = {
+    'claude-sonnet-4.5': 'claude-sonnet-4-20250514',
+    'claude-sonnet-4': 'claude-sonnet-4-20250514',
+    'claude-opus-4': 'claude-opus-4-20250514',
+    'claude-haiku-4': 'claude-haiku-4-20250514'
+}
+DEFAULT_ANTHROPIC_MODEL = 'claude-sonnet-4-20250514'
+
+# HTTP statuses worth retrying (timeouts, conflicts, rate limits, server/overload errors)
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+# Parsed chunk types reported as functions
+FUNC_TYPES = frozenset({'function', 'async_function'})
+
+# Rough characters-per-token ratio used to estimate prompt sizes
+CHARS_PER_TOKEN = 4
+
+# Top-level definitions where oversized file content is preferably split
+SPLIT_PREFIXES = ('def ', 'async def ', 'class ', '@')
+
+# Placeholder outline key point templates
+MOCK_POINT_TEMPLATE = "Point {index} for {title}"
+SECTION_POINT_TEMPLATE = "Key point {index} based on summary for {title}"
+
+
+@lru_cache(maxsize=1024)
+def _section_points(point_template: str, title: str) -> Tuple[str, ...]:
+    """Three numbered outline points for a section title (cached by template and title)"""
+    return tuple(point_template.format(index=i, title=title) for i in (1, 2, 3))
+
+
+@lru_cache(maxsize=64)
+def _compile_prompt(template: str) -> Optional[Tuple[Tuple[str, Optional[str]], ...]]:
+    """
+    Pre-parse a str.format prompt into (literal, field name) pairs (cached by template text)
+    
+    Returns None when the template uses format specs, conversions, attribute/index
+    access or positional fields, which are left to str.format.
+    """
+    parts = []
+    try:
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            if field is not None and (spec or conversion or not field.isidentifier()):
+                return None
+            parts.append((literal, field))
+    except ValueError:
+        return None
+    return tuple(parts)
+
+
+def _render_prompt(template: str, **values: str) -> str:
+    """Fill a prompt template, equivalent to template.format(**values) for plain named fields"""
+    parts = _compile_prompt(template)
+    if parts is None:
+        return template.format(**values)
+    values = {key: value if isinstance(value, str) else format(value) for key, value in values.items()}
+    return ''.join([literal + values[field] if field is not None else literal
+                    for literal, field in parts])
+
+
+def _split_content(content: str, max_chars: int) -> List[str]:
+    """
+    Split file content into pieces of at most max_chars characters
+    
+    Pieces break before top-level definitions where possible; a single
+    definition longer than max_chars is cut at line (or, failing that,
+    character) boundaries.
+    """
+    blocks, current = [], []
+    for line in content.splitlines(keepends=True):
+        if current and line.startswith(SPLIT_PREFIXES) and not current[-1].startswith('@'):
+            blocks.append(''.join(current))
+            current = []
+        current.append(line)
+    if current:
+        blocks.append(''.join(current))
+    
+    pieces, piece = [], ''
+    for block in blocks:
+        if len(piece) + len(block) <= max_chars:
+            piece += block
+            continue
+        if piece:
+            pieces.append(piece)
+            piece = ''
+        while len(block) > max_chars:
+            cut = block.rfind('\n', 0, max_chars) + 1 or max_chars
+            pieces.append(block[:cut])
+            block = block[cut:]
+        piece = block
+    if piece:
+        pieces.append(piece)
+    return pieces
+
 
 class LLMSummarizationTool(BaseTool):
     """Tool for LLM-based code summarization"""
@@ -20,9 +133,26 @@ class LLMSummarizationTool(BaseTool):
         self.model = config.get('model', 'claude-sonnet-4.5')
         self.max_retries = config.get('max_retries', 3)
         self.retry_delay = config.get('retry_delay', 2)
+        self.retry_cap = config.get('retry_cap', 30)
+        self.llm_cache_enabled = config.get('llm_cache_enabled', True)
+        self.llm_cache_dir = config.get('llm_cache_dir', '.cache/llm')
+        self.max_input_tokens = config.get('max_input_tokens', 150_000)
         
-        # Load prompts
+        # Load prompts once; template overrides are cached as (mtime, text)
         self.prompts = self._load_prompts()
+        self._template_cache: Dict[Tuple[str, str], Tuple[float, Optional[str]]] = {}
+        self._debug_dirs_ready = set()
+        
+        # Background event loop that owns the async client's connection pool
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+        
+        # Worker threads for fanning out synchronous facade calls (created lazily).
+        # Parts of oversized files get their own pool: the file tasks that wait
+        # on them may occupy every worker of the first one.
+        self._executor = None
+        self._part_executor = None
         
         # Initialize LLM Facade
         self.llm_facade = None
@@ -44,6 +174,145 @@ class LLMSummarizationTool(BaseTool):
             self.llm_facade = None
             if not self.default_mock_mode:
                 self.default_mock_mode = True
+        
+        # Async clients for the direct API path, created on first use (see
+        # _ensure_async_clients); with the facade they are never needed
+        self._async_client = None
+        self._async_clients = []
+        self._async_clients_initialized = False
+        self._client_cycle = None
+        self._client_cooldown: Dict[int, float] = {}
+        self._http = None
+        
+        # Sync client for the direct API path, created once so retries and
+        # later calls reuse its connection pool
+        self._api_model = ANTHROPIC_MODEL_MAP.get(self.model, DEFAULT_ANTHROPIC_MODEL)
+        self._anthropic = None
+        if os.environ.get('ANTHROPIC_API_KEY'):
+            try:
+                if Anthropic is None:
+                    raise ImportError("anthropic package is required")
+                self._anthropic = Anthropic(api_key=os.environ['ANTHROPIC_API_KEY'])
+            except Exception as e:
+                print(f"[WARNING] Could not initialize Anthropic client: {e}")
+    
+    def _ensure_async_clients(self) -> bool:
+        """
+        Create the pooled async clients on first use
+        
+        They are created once so their keep-alive connections are reused
+        across calls. ANTHROPIC_API_KEYS (comma-separated) spreads requests
+        over several keys' rate limits.
+        
+        Returns:
+            Whether an async client is available
+        """
+        if not self._async_clients_initialized:
+            with self._loop_lock:
+                if not self._async_clients_initialized:
+                    self._create_async_clients()
+                    self._async_clients_initialized = True
+        return self._async_client is not None
+    
+    def _create_async_clients(self) -> None:
+        """Build the shared httpx pool and one AsyncAnthropic client per API key"""
+        api_keys = [k.strip() for k in os.environ.get('ANTHROPIC_API_KEYS', '').split(',') if k.strip()]
+        if not api_keys and os.environ.get('ANTHROPIC_API_KEY'):
+            api_keys = [os.environ['ANTHROPIC_API_KEY']]
+        if not api_keys:
+            return
+        try:
+            if AsyncAnthropic is None:
+                raise ImportError("anthropic and httpx packages are required")
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.config.get('max_connections', 256),
+                    max_keepalive_connections=self.config.get('max_keepalive_connections', 64)
+                ),
+                timeout=httpx.Timeout(self.config.get('http_timeout', 120.0))
+            )
+            self._async_clients = [AsyncAnthropic(api_key=k, http_client=self._http) for k in api_keys]
+            self._async_client = self._async_clients[0]
+            self._client_cycle = cycle(range(len(self._async_clients)))
+        except Exception as e:
+            print(f"[WARNING] Could not initialize async Anthropic client: {e}")
+            self._http = None
+            self._async_clients = []
+    
+    def _next_async_client(self):
+        """
+        Pick the next pooled async client round-robin
+        
+        Clients that recently hit a rate limit are skipped until their
+        cooldown expires; if every client is cooling down, rotation continues
+        regardless.
+        
+        Returns:
+            Tuple of (client index, client)
+        """
+        now = time.monotonic()
+        for _ in range(len(self._async_clients)):
+            index = next(self._client_cycle)
+            if self._client_cooldown.get(index, 0) <= now:
+                return index, self._async_clients[index]
+        return index, self._async_clients[index]
+    
+    def _run_async(self, coro):
+        """
+        Run a coroutine on the tool's background event loop and wait for it
+        
+        httpx connection pools are bound to the loop they are used on, so all
+        batch work shares one long-lived loop instead of a fresh asyncio.run().
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+                self._loop_thread.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    def close(self):
+        """Release the HTTP connection pool and stop the background event loop"""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            if self._http is not None:
+                asyncio.run_coroutine_threadsafe(self._http.aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            self._loop_thread.join(timeout=5)
+            loop.close()
+        self._async_client = None
+        self._async_clients = []
+        self._async_clients_initialized = False
+        self._http = None
+        with self._loop_lock:
+            executors = (self._executor, self._part_executor)
+            self._executor = self._part_executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=True)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the shared worker pool, creating it on first use"""
+        if self._executor is None:
+            with self._loop_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.config.get('max_workers', 8),
+                        thread_name_prefix='llm-summarize'
+                    )
+        return self._executor
+    
+    def _get_part_executor(self) -> ThreadPoolExecutor:
+        """Return the pool for summarizing parts of oversized files, creating it on first use"""
+        if self._part_executor is None:
+            with self._loop_lock:
+                if self._part_executor is None:
+                    self._part_executor = ThreadPoolExecutor(
+                        max_workers=self.config.get('max_workers', 8),
+                        thread_name_prefix='llm-summarize-part'
+                    )
+        return self._part_executor
     
     def _load_prompts(self) -> Dict[str, str]:
         """Load prompt templates from files"""
@@ -55,11 +324,14 @@ class LLMSummarizationTool(BaseTool):
         
         for prompt_name, filename in prompt_files.items():
             filepath = os.path.join(self.prompts_dir, filename)
-            if os.path.exists(filepath):
+            try:
                 with open(filepath, 'r', encoding='utf-8') as f:
                     prompts[prompt_name] = f.read()
-            else:
+            except FileNotFoundError:
                 prompts[prompt_name] = f"[Prompt not found: {filename}]"
+                continue
+            # Parse the placeholders once up front
+            _compile_prompt(prompts[prompt_name])
         
         return prompts
     
@@ -68,7 +340,7 @@ class LLMSummarizationTool(BaseTool):
         Execute LLM summarization operations
         
         Args:
-            action: Operation to perform (summarize_file, hierarchical_summary, generate_outline)
+            action: Operation to perform (summarize_file, summarize_files_batch, hierarchical_summary, generate_outline)
             **kwargs: Action-specific parameters
             
         Returns:
@@ -77,6 +349,8 @@ class LLMSummarizationTool(BaseTool):
         try:
             if action == "summarize_file":
                 return self._summarize_file(**kwargs)
+            elif action == "summarize_files_batch":
+                return self._summarize_files_batch_sync(**kwargs)
             elif action == "hierarchical_summary":
                 return self._hierarchical_summary(**kwargs)
             elif action == "generate_outline":
@@ -92,7 +366,8 @@ class LLMSummarizationTool(BaseTool):
                 'error': f'LLM summarization error: {str(e)}'
             }
     
-    def _summarize_file(self, file_path: str, content: str, use_mock: bool = None, template_name: str = None) -> Dict[str, Any]:
+    def _summarize_file(self, file_path: str, content: str, use_mock: bool = None, template_name: str = None,
+                        stream: bool = False) -> Dict[str, Any]:
         """
         Summarize a single file
         
@@ -100,6 +375,8 @@ class LLMSummarizationTool(BaseTool):
             file_path: Path to the file
             content: File content
             use_mock: Whether to use mock LLM (default from config)
+            stream: Return 'summary_stream', an iterator of text chunks, instead
+                of 'summary' so callers can consume output as it is generated
             
         Returns:
             Dictionary with summary
@@ -107,31 +384,23 @@ class LLMSummarizationTool(BaseTool):
         if use_mock is None:
             use_mock = self.default_mock_mode
         
-        # Resolve prompt template with optional overrides from template
-        prompt_template = self.prompts.get('file_summary')
-        if template_name:
-            candidate_path = template_name
-            if not os.path.isabs(candidate_path) and os.sep not in candidate_path:
-                candidate_path = os.path.join(self.prompts_dir.replace('prompts', 'templates'), f'{template_name}.json')
-            try:
-                if os.path.exists(candidate_path):
-                    import json as _json
-                    with open(candidate_path, 'r', encoding='utf-8') as _f:
-                        tmpl = _json.load(_f)
-                    prm = (tmpl or {}).get('prompts', {})
-                    if prm.get('file_summary_prompt_text'):
-                        prompt_template = prm['file_summary_prompt_text']
-                    elif prm.get('file_summary_prompt_path') and os.path.exists(prm['file_summary_prompt_path']):
-                        with open(prm['file_summary_prompt_path'], 'r', encoding='utf-8') as pf:
-                            prompt_template = pf.read()
-            except Exception:
-                pass
-
-        # Format prompt
-        prompt = prompt_template.format(
-            file_path=file_path,
-            content=content
-        )
+        prompt_content = content
+        if not use_mock and len(content) // CHARS_PER_TOKEN > self.max_input_tokens:
+            prompt_content = self._condense_content(file_path, content, template_name)
+        prompt = self._build_file_summary_prompt(file_path, prompt_content, template_name)
+        
+        if stream:
+            if use_mock:
+                summary_stream = iter([self._mock_llm_call(prompt, context="file_summary")])
+            else:
+                summary_stream = self._real_llm_call_stream(prompt)
+            return {
+                'success': True,
+                'summary_stream': summary_stream,
+                'file_path': file_path,
+                'mock_mode': use_mock,
+                'content_length': len(content)
+            }
         
         # Generate summary (mock or real)
         if use_mock:
@@ -147,6 +416,318 @@ class LLMSummarizationTool(BaseTool):
             'content_length': len(content)
         }
     
+    async def _summarize_file_async(self, file_path: str, content: str, use_mock: bool = None,
+                                    template_name: str = None) -> Dict[str, Any]:
+        """
+        Summarize a single file without blocking the event loop
+        
+        Args:
+            file_path: Path to the file
+            content: File content
+            use_mock: Whether to use mock LLM (default from config)
+            template_name: Template providing prompt overrides (optional)
+            
+        Returns:
+            Dictionary with summary
+        """
+        if use_mock is None:
+            use_mock = self.default_mock_mode
+        
+        prompt_content = content
+        if not use_mock and len(content) // CHARS_PER_TOKEN > self.max_input_tokens:
+            prompt_content = await self._condense_content_async(file_path, content, template_name)
+        prompt = self._build_file_summary_prompt(file_path, prompt_content, template_name)
+        
+        if use_mock:
+            summary = self._mock_llm_call(prompt, context="file_summary")
+        else:
+            summary = await self._real_llm_call_async(prompt)
+        
+        return {
+            'success': True,
+            'summary': summary,
+            'file_path': file_path,
+            'mock_mode': use_mock,
+            'content_length': len(content)
+        }
+    
+    def _content_part_prompts(self, file_path: str, content: str, template_name: str = None) -> List[str]:
+        """Split oversized content and build one file summary prompt per part"""
+        pieces = _split_content(content, self.max_input_tokens * CHARS_PER_TOKEN)
+        return [
+            self._build_file_summary_prompt(f"{file_path} (part {i} of {len(pieces)})", piece, template_name)
+            for i, piece in enumerate(pieces, 1)
+        ]
+    
+    def _condense_content(self, file_path: str, content: str, template_name: str = None) -> str:
+        """
+        Replace content that exceeds max_input_tokens with summaries of its parts
+        
+        The parts are summarized in parallel on a pool separate from the one
+        running whole-file tasks, so a full file pool cannot deadlock waiting
+        on them; the joined part summaries are then summarized as the file's
+        content.
+        
+        Args:
+            file_path: Path to the file
+            content: File content
+            template_name: Template providing prompt overrides (optional)
+            
+        Returns:
+            Joined part summaries
+        """
+        part_summaries = self._get_part_executor().map(
+            self._real_llm_call, self._content_part_prompts(file_path, content, template_name))
+        return "\n\n".join(f"Part {i} summary:\n{summary}" for i, summary in enumerate(part_summaries, 1))
+    
+    async def _condense_content_async(self, file_path: str, content: str, template_name: str = None) -> str:
+        """Async counterpart of _condense_content"""
+        part_summaries = await asyncio.gather(*[
+            self._real_llm_call_async(prompt)
+            for prompt in self._content_part_prompts(file_path, content, template_name)
+        ])
+        return "\n\n".join(f"Part {i} summary:\n{summary}" for i, summary in enumerate(part_summaries, 1))
+    
+    async def summarize_files_batch(self, files: List[Dict[str, Any]], use_mock: bool = None,
+                                    template_name: str = None, max_concurrency: int = 8,
+                                    use_batch_api: bool = None) -> List[Dict[str, Any]]:
+        """
+        Summarize many files concurrently
+        
+        Large real-mode batches can instead go through the Anthropic Message
+        Batches API (see _use_batch_api); if that fails, the concurrent path
+        is used.
+        
+        Args:
+            files: List of dictionaries with 'file_path' and 'content'
+            use_mock: Whether to use mock LLM (default from config)
+            template_name: Template providing prompt overrides (optional)
+            max_concurrency: Maximum number of LLM calls in flight
+            use_batch_api: Allow the Message Batches API (default from config)
+            
+        Returns:
+            List of per-file summary results, in input order
+        """
+        if use_mock is None:
+            use_mock = self.default_mock_mode
+        
+        if not use_mock and self._use_batch_api(len(files), use_batch_api):
+            try:
+                return await asyncio.to_thread(self._summarize_files_via_batch_api, files, template_name)
+            except Exception as e:
+                print(f"[WARNING] Message Batches API failed ({e}), summarizing files individually")
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        # The facade is synchronous and would block the event loop, so its
+        # calls are fanned out over the worker pool instead
+        if not use_mock and self.llm_facade is not None:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            
+            async def _in_executor(file_data: Dict[str, Any]) -> Dict[str, Any]:
+                file_path = file_data.get('file_path') or file_data.get('path')
+                async with semaphore:
+                    try:
+                        return await loop.run_in_executor(
+                            executor, self._summarize_file, file_path, file_data.get('content', ''),
+                            use_mock, template_name)
+                    except Exception as e:
+                        return {
+                            'success': False,
+                            'file_path': file_path,
+                            'error': f'LLM summarization error: {str(e)}'
+                        }
+            
+            return await asyncio.gather(*[_in_executor(f) for f in files])
+        
+        
+        async def _bounded(file_data: Dict[str, Any]) -> Dict[str, Any]:
+            file_path = file_data.get('file_path') or file_data.get('path')
+            async with semaphore:
+                try:
+                    return await self._summarize_file_async(
+                        file_path, file_data.get('content', ''), use_mock=use_mock, template_name=template_name)
+                except Exception as e:
+                    return {
+                        'success': False,
+                        'file_path': file_path,
+                        'error': f'LLM summarization error: {str(e)}'
+                    }
+        
+        return await asyncio.gather(*[_bounded(f) for f in files])
+    
+    def _summarize_files_batch_sync(self, files: List[Dict[str, Any]], use_mock: bool = None,
+                                    template_name: str = None, max_concurrency: int = 8,
+                                    use_batch_api: bool = None) -> Dict[str, Any]:
+        """
+        Run summarize_files_batch from synchronous code
+        
+        Args:
+            files: List of dictionaries with 'file_path' and 'content'
+            use_mock: Whether to use mock LLM (default from config)
+            template_name: Template providing prompt overrides (optional)
+            max_concurrency: Maximum number of LLM calls in flight
+            use_batch_api: Allow the Message Batches API (default from config)
+            
+        Returns:
+            Dictionary with per-file summaries
+        """
+        results = self._run_async(self.summarize_files_batch(
+            files, use_mock=use_mock, template_name=template_name, max_concurrency=max_concurrency,
+            use_batch_api=use_batch_api))
+        
+        return {
+            'success': True,
+            'summaries': results,
+            'files_count': len(results),
+            'failed_count': sum(1 for r in results if not r.get('success'))
+        }
+    
+    def _use_batch_api(self, files_count: int, use_batch_api: bool = None) -> bool:
+        """
+        Whether a batch should go through the Message Batches API
+        
+        Batches are billed at half price but may take minutes to hours to
+        finish, so the path is opt-in ('use_batch_api') and only used for at
+        least 'batch_threshold' files against Anthropic directly.
+        """
+        if use_batch_api is None:
+            use_batch_api = self.config.get('use_batch_api', False)
+        return (bool(use_batch_api)
+                and files_count >= self.config.get('batch_threshold', 20)
+                and self.provider == 'anthropic'
+                and bool(os.environ.get('ANTHROPIC_API_KEY')))
+    
+    def _summarize_files_via_batch_api(self, files: List[Dict[str, Any]],
+                                       template_name: str = None) -> List[Dict[str, Any]]:
+        """
+        Summarize files with one Message Batches API submission
+        
+        Args:
+            files: List of dictionaries with 'file_path' and 'content'
+            template_name: Template providing prompt overrides (optional)
+            
+        Returns:
+            List of per-file summary results, in input order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(files)
+        prompts = []
+        prompt_slots = []
+        
+        for i, file_data in enumerate(files):
+            file_path = file_data.get('file_path') or file_data.get('path')
+            try:
+                # Oversized files are condensed first, as on the per-file path
+                prompt_content = file_data.get('content', '')
+                if len(prompt_content) // CHARS_PER_TOKEN > self.max_input_tokens:
+                    prompt_content = self._condense_content(file_path, prompt_content, template_name)
+                prompts.append(self._build_file_summary_prompt(file_path, prompt_content, template_name))
+                prompt_slots.append(i)
+            except Exception as e:
+                results[i] = {
+                    'success': False,
+                    'file_path': file_path,
+                    'error': f'LLM summarization error: {str(e)}'
+                }
+        
+        summaries = self._real_llm_call_batched(prompts) if prompts else []
+        for i, summary in zip(prompt_slots, summaries):
+            content = files[i].get('content', '')
+            results[i] = {
+                'success': True,
+                'summary': summary,
+                'file_path': files[i].get('file_path') or files[i].get('path'),
+                'mock_mode': False,
+                'content_length': len(content)
+            }
+        
+        return results
+    
+    def _build_file_summary_prompt(self, file_path: str, content: str, template_name: str = None) -> str:
+        """
+        Build the file summary prompt, applying template overrides if given
+        
+        Args:
+            file_path: Path to the file
+            content: File content
+            template_name: Template providing prompt overrides (optional)
+            
+        Returns:
+            Formatted prompt string
+        """
+        # Resolve prompt template with optional overrides from template
+        prompt_template = self.prompts.get('file_summary')
+        if template_name:
+            templates_dir = self.prompts_dir.replace('prompts', 'templates')
+            prompt_template = self._resolve_template('file_summary', template_name, templates_dir) or prompt_template
+        
+        # Format prompt
+        return _render_prompt(
+            prompt_template,
+            file_path=file_path,
+            content=content
+        )
+    
+    def _resolve_template(self, kind: str, template_name: str, templates_dir: str) -> Optional[str]:
+        """
+        Resolve a prompt override from a template's 'prompts' block
+        
+        An inline '<kind>_prompt_text' wins over '<kind>_prompt_path'. Results
+        are cached per template path and reused until the template's mtime
+        changes; with 'cache_templates_aggressive' set, cached entries are
+        returned without re-checking the file.
+        
+        Args:
+            kind: Prompt kind ('file_summary' or 'hierarchical_summary')
+            template_name: Template name or path to template JSON
+            templates_dir: Directory holding named templates
+            
+        Returns:
+            Override prompt text, or None if the template provides none
+        """
+        candidate_path = template_name
+        if not os.path.isabs(candidate_path) and os.sep not in candidate_path:
+            candidate_path = os.path.join(templates_dir, f'{template_name}.json')
+        
+        cache_key = (candidate_path, kind)
+        cached = self._template_cache.get(cache_key)
+        if cached and self.config.get('cache_templates_aggressive'):
+            return cached[1]
+        
+        # Open first and stat the open handle rather than probing the path
+        try:
+            f = open(candidate_path, 'r', encoding='utf-8')
+        except OSError:
+            return None
+        
+        prompt_text = None
+        with f:
+            try:
+                mtime = os.fstat(f.fileno()).st_mtime
+            except OSError:
+                return None
+            if cached and cached[0] == mtime:
+                return cached[1]
+            try:
+                tmpl = json.load(f)
+                prm = (tmpl or {}).get('prompts', {})
+                # 1) explicit inline text override
+                if prm.get(f'{kind}_prompt_text'):
+                    prompt_text = prm[f'{kind}_prompt_text']
+                # 2) path override to a file
+                elif prm.get(f'{kind}_prompt_path'):
+                    try:
+                        with open(prm[f'{kind}_prompt_path'], 'r', encoding='utf-8') as pf:
+                            prompt_text = pf.read()
+                    except OSError:
+                        pass
+            except Exception:
+                pass
+        
+        self._template_cache[cache_key] = (mtime, prompt_text)
+        return prompt_text
+    
     def _hierarchical_summary(self, parsed_files: List[Dict[str, Any]] = None, file_summaries: Dict[str, Any] = None, use_mock: bool = None, template_name: str = None, debug_dir: str = None, workflow_id: str = None, node_id: str = None) -> Dict[str, Any]:
         """
         Generate hierarchical summary from parsed files or file summaries
@@ -187,57 +768,34 @@ class LLMSummarizationTool(BaseTool):
 
         # Load template prompt overrides if template_name provided
         if template_name:
-            candidate_path = template_name
-            if not os.path.isabs(candidate_path) and os.sep not in candidate_path:
-                candidate_path = os.path.join('data/templates', f'{template_name}.json')
-            try:
-                if os.path.exists(candidate_path):
-                    import json as _json
-                    with open(candidate_path, 'r', encoding='utf-8') as _f:
-                        tmpl = _json.load(_f)
-                    prm = (tmpl or {}).get('prompts', {})
-                    # 1) explicit inline text override
-                    if prm.get('hierarchical_summary_prompt_text'):
-                        prompt_template = prm['hierarchical_summary_prompt_text']
-                    # 2) path override to a file
-                    elif prm.get('hierarchical_summary_prompt_path'):
-                        pth = prm['hierarchical_summary_prompt_path']
-                        if os.path.exists(pth):
-                            with open(pth, 'r', encoding='utf-8') as pf:
-                                prompt_template = pf.read()
-            except Exception:
-                pass
-
-        # Format prompt
-        prompt = prompt_template.format(
-            file_summaries=formatted_summaries
-        )
+            prompt_template = self._resolve_template('hierarchical_summary', template_name, 'data/templates') or prompt_template
 
-        # Debug artifacts
-        if debug_dir:
-            try:
-                import os
-                os.makedirs(debug_dir, exist_ok=True)
-                with open(os.path.join(debug_dir, 'hierarchical_prompt.txt'), 'w', encoding='utf-8') as f:
-                    f.write(prompt)
-                with open(os.path.join(debug_dir, 'file_summaries.txt'), 'w', encoding='utf-8') as f:
-                    f.write(formatted_summaries)
-            except Exception:
-                pass
-        
-        # Generate summary
-        if use_mock:
-            summary = self._mock_llm_call(prompt, context="hierarchical_summary")
+        # Large real-mode inputs are summarized in groups first (map-reduce)
+        if (not use_mock and parsed_files and isinstance(parsed_files, list)
+                and len(parsed_files) > self.config.get('hierarchical_threshold', 30)):
+            prompt, formatted_summaries, summary = self._run_async(self._hierarchical_summary_mapreduce(
+                parsed_files, prompt_template, group_size=self.config.get('hierarchical_group_size', 20)))
         else:
-            summary = self._real_llm_call(prompt)
+            # Format prompt
+            prompt = _render_prompt(
+                prompt_template,
+                file_summaries=formatted_summaries
+            )
 
+            # Generate summary
+            if use_mock:
+                summary = self._mock_llm_call(prompt, context="hierarchical_summary")
+            else:
+                summary = self._real_llm_call(prompt)
+
+        # Debug artifacts (the LLM call falls back to mock rather than raising,
+        # so everything is written together afterwards)
         if debug_dir:
-            try:
-                import os
-                with open(os.path.join(debug_dir, 'hierarchical_output.txt'), 'w', encoding='utf-8') as f:
-                    f.write(summary)
-            except Exception:
-                pass
+            self._write_debug(debug_dir, {
+                'hierarchical_prompt.txt': prompt,
+                'file_summaries.txt': formatted_summaries,
+                'hierarchical_output.txt': summary
+            })
         
         files_count = 0
         if parsed_files and isinstance(parsed_files, list):
@@ -252,6 +810,73 @@ class LLMSummarizationTool(BaseTool):
             'mock_mode': use_mock
         }
     
+    async def _hierarchical_summary_mapreduce(self, parsed_files: List[Dict[str, Any]], prompt_template: str,
+                                              group_size: int = 20, max_concurrency: int = 8) -> Tuple[str, str, str]:
+        """
+        Summarize parsed files in groups concurrently, then summarize the group summaries
+        
+        Groups hold at most group_size files and roughly hierarchical_group_tokens
+        tokens (estimated as len(text) // CHARS_PER_TOKEN).
+        
+        Args:
+            parsed_files: List of parsed file dictionaries
+            prompt_template: Hierarchical summary prompt template
+            group_size: Maximum number of files per group
+            max_concurrency: Maximum number of group LLM calls in flight
+            
+        Returns:
+            Tuple of (reduce prompt, joined group summaries, final summary)
+        """
+        token_budget = self.config.get('hierarchical_group_tokens', 50000)
+        
+        # Map: shard files by count and estimated token size
+        groups = []
+        group, group_tokens = [], 0
+        for parsed_file in parsed_files:
+            formatted = self._format_parsed_files([parsed_file])
+            tokens = len(formatted) // CHARS_PER_TOKEN
+            if group and (len(group) >= group_size or group_tokens + tokens > token_budget):
+                groups.append("\n\n".join(group))
+                group, group_tokens = [], 0
+            group.append(formatted)
+            group_tokens += tokens
+        if group:
+            groups.append("\n\n".join(group))
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def _summarize_group(group_text: str) -> str:
+            async with semaphore:
+                return await self._real_llm_call_async(_render_prompt(prompt_template, file_summaries=group_text))
+        
+        group_summaries = await asyncio.gather(*[_summarize_group(g) for g in groups])
+        
+        # Reduce: one call over the group summaries
+        formatted_summaries = "\n\n".join(
+            f"Group {i} summary:\n{group_summary}" for i, group_summary in enumerate(group_summaries, 1))
+        prompt = _render_prompt(prompt_template, file_summaries=formatted_summaries)
+        summary = await self._real_llm_call_async(prompt)
+        
+        return prompt, formatted_summaries, summary
+    
+    def _write_debug(self, debug_dir: str, files: Dict[str, str]) -> None:
+        """
+        Write debug artifacts, creating the directory only the first time it is seen
+        
+        Args:
+            debug_dir: Directory to write into
+            files: Mapping of file name to content
+        """
+        try:
+            if debug_dir not in self._debug_dirs_ready:
+                os.makedirs(debug_dir, exist_ok=True)
+                self._debug_dirs_ready.add(debug_dir)
+            for file_name, content in files.items():
+                with open(os.path.join(debug_dir, file_name), 'w', encoding='utf-8') as f:
+                    f.write(content)
+        except Exception:
+            pass
+    
     def _generate_outline(self, template: Dict[str, Any], summary: str, use_mock: bool = None) -> Dict[str, Any]:
         """
         Generate documentation outline from template and summary
@@ -282,11 +907,7 @@ class LLMSummarizationTool(BaseTool):
             
             # In mock mode, generate simple key points
             if use_mock:
-                section_outline['key_points'] = [
-                    f"Point 1 for {section.get('title')}",
-                    f"Point 2 for {section.get('title')}",
-                    f"Point 3 for {section.get('title')}"
-                ]
+                section_outline['key_points'] = list(_section_points(MOCK_POINT_TEMPLATE, section_outline['title']))
             else:
                 # Real LLM would analyze summary and generate specific points
                 section_outline['key_points'] = self._generate_section_points(section, summary)
@@ -388,7 +1009,11 @@ The main runner script coordinates execution across modules, managing dependenci
         Returns:
             LLM response string
         """
-        import time
+        cache_path = self._llm_cache_path(prompt)
+        if cache_path:
+            cached = self._read_llm_cache(cache_path)
+            if cached is not None:
+                return cached
         
         last_error = None
         
@@ -404,18 +1029,24 @@ The main runner script coordinates execution across modules, managing dependenci
                         max_tokens=8192
                     )
                     
+                    # The facade answers with mock text when the provider fails;
+                    # return it but never cache it
+                    used_fallback = getattr(self.llm_facade, 'used_fallback', None)
+                    if used_fallback is not None and used_fallback():
+                        cache_path = None
+                    
                     # Accept string responses from facade or dict-like responses
                     if isinstance(response, str):
                         if response.strip():
-                            return response
+                            return self._cache_response(cache_path, response)
                         else:
                             last_error = "Empty string response from LLM"
                             continue
                     if response and isinstance(response, dict):
                         if 'text' in response:
-                            return response['text']
+                            return self._cache_response(cache_path, response['text'])
                         if 'content' in response:
-                            return response['content']
+                            return self._cache_response(cache_path, response['content'])
                         last_error = f"Invalid response format: {response}"
                         continue
                     last_error = f"Unexpected response type: {type(response)}"
@@ -423,28 +1054,17 @@ The main runner script coordinates execution across modules, managing dependenci
                 
                 else:
                     # Fallback: Direct API call
-                    api_key = os.environ.get('ANTHROPIC_API_KEY')
-                    if not api_key:
-                        # Gracefully fall back to mock
-                        print("[INFO] No API key found, using mock mode")
-                        return self._mock_llm_call(prompt, context="file_summary")
+                    if self._anthropic is None:
+                        if not os.environ.get('ANTHROPIC_API_KEY'):
+                            # Gracefully fall back to mock
+                            print("[INFO] No API key found, using mock mode")
+                            return self._mock_llm_call(prompt, context="file_summary")
+                        last_error = "Anthropic client is not available"
+                        break
                     
                     try:
-                        from anthropic import Anthropic
-                        client = Anthropic(api_key=api_key)
-                        
-                        # Map model names for API
-                        model_map = {
-                            'claude-sonnet-4.5': 'claude-sonnet-4-20250514',
-                            'claude-sonnet-4': 'claude-sonnet-4-20250514',
-                            'claude-opus-4': 'claude-opus-4-20250514',
-                            'claude-haiku-4': 'claude-haiku-4-20250514'
-                        }
-                        
-                        api_model = model_map.get(self.model, 'claude-sonnet-4-20250514')
-                        
-                        message = client.messages.create(
-                            model=api_model,
+                        message = self._anthropic.messages.create(
+                            model=self._api_model,
                             max_tokens=8192,
                             temperature=0.2,
                             messages=[
@@ -452,24 +1072,260 @@ The main runner script coordinates execution across modules, managing dependenci
                             ]
                         )
                         
-                        return message.content[0].text
+                        return self._cache_response(cache_path, message.content[0].text)
                     
                     except Exception as e:
                         last_error = f"Claude API error: {str(e)}"
+                        if not self._is_retryable_error(e):
+                            break
                         if attempt < self.max_retries - 1:
-                            time.sleep(self.retry_delay * (attempt + 1))
+                            time.sleep(self._backoff_delay(attempt))
                             continue
             
             except Exception as e:
                 last_error = f"LLM call error: {str(e)}"
+                if not self._is_retryable_error(e):
+                    break
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
+                    time.sleep(self._backoff_delay(attempt))
                     continue
         
         # All retries failed, fall back to mock
         print(f"[WARNING] All LLM API attempts failed ({last_error}), falling back to mock mode")
         return self._mock_llm_call(prompt, context="file_summary")
 
+    async def _real_llm_call_async(self, prompt: str) -> str:
+        """
+        Async LLM API call (Claude) with retry logic
+        
+        Uses the shared AsyncAnthropic client for the direct API path; when the
+        LLM Facade is in use (it is synchronous) the call runs in a worker thread.
+        
+        Args:
+            prompt: Input prompt
+            
+        Returns:
+            LLM response string
+        """
+        if self.llm_facade or not self._ensure_async_clients():
+            return await asyncio.to_thread(self._real_llm_call, prompt)
+        
+        cache_path = self._llm_cache_path(prompt)
+        if cache_path:
+            cached = await asyncio.to_thread(self._read_llm_cache, cache_path)
+            if cached is not None:
+                return cached
+        
+        last_error = None
+        for attempt in range(self.max_retries):
+            client_index, client = self._next_async_client()
+            try:
+                message = await client.messages.create(
+                    model=self._api_model,
+                    max_tokens=8192,
+                    temperature=0.2,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ]
+                )
+                
+                return self._cache_response(cache_path, message.content[0].text)
+            
+            except Exception as e:
+                last_error = f"Claude API error: {str(e)}"
+                if getattr(e, 'status_code', None) == 429:
+                    # Rest this key; the next attempt rotates to another one
+                    self._client_cooldown[client_index] = time.monotonic() + self.config.get('rate_limit_cooldown', 30)
+                if not self._is_retryable_error(e):
+                    break
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self._backoff_delay(attempt))
+        
+        # All retries failed, fall back to mock
+        print(f"[WARNING] All LLM API attempts failed ({last_error}), falling back to mock mode")
+        return self._mock_llm_call(prompt, context="file_summary")
+
+    def _real_llm_call_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream an LLM response as text chunks
+        
+        Uses the Anthropic streaming API on the direct path. The LLM Facade has
+        no streaming interface, so with the facade (or on a cache hit) the full
+        response is yielded as a single chunk. If the stream fails before any
+        text arrives, the regular retrying call is used instead.
+        
+        Args:
+            prompt: Input prompt
+            
+        Returns:
+            Iterator of response text chunks
+        """
+        cache_path = self._llm_cache_path(prompt)
+        cached = self._read_llm_cache(cache_path) if cache_path else None
+        if cached is not None or self.llm_facade or self._anthropic is None:
+            yield cached if cached is not None else self._real_llm_call(prompt)
+            return
+        
+        chunks = []
+        try:
+            with self._anthropic.messages.stream(
+                model=self._api_model,
+                max_tokens=8192,
+                temperature=0.2,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            ) as stream:
+                for text in stream.text_stream:
+                    chunks.append(text)
+                    yield text
+        except Exception:
+            if chunks:
+                raise
+            yield self._real_llm_call(prompt)
+            return
+        
+        self._cache_response(cache_path, ''.join(chunks))
+    
+    def _real_llm_call_batched(self, prompts: List[str]) -> List[str]:
+        """
+        Run many prompts through the Anthropic Message Batches API
+        
+        Cached responses are reused and only misses are submitted. The batch is
+        polled with exponential backoff until it ends or 'batch_poll_timeout'
+        seconds pass (then it is cancelled). Prompts without a successful batch
+        result fall back to _real_llm_call one at a time.
+        
+        Args:
+            prompts: Input prompts
+            
+        Returns:
+            Response strings, in prompt order
+        """
+        client = self._anthropic
+        if client is None:
+            raise RuntimeError("Anthropic client is not available")
+        
+        responses: List[Optional[str]] = [None] * len(prompts)
+        cache_paths = [self._llm_cache_path(prompt) for prompt in prompts]
+        pending: Dict[str, int] = {}
+        for i, cache_path in enumerate(cache_paths):
+            cached = self._read_llm_cache(cache_path) if cache_path else None
+            if cached is not None:
+                responses[i] = cached
+            else:
+                pending[f"p{i}"] = i
+        
+        if pending:
+            batch = client.messages.batches.create(requests=[
+                {
+                    "custom_id": custom_id,
+                    "params": {
+                        "model": self._api_model,
+                        "max_tokens": 8192,
+                        "temperature": 0.2,
+                        "messages": [{"role": "user", "content": prompts[i]}]
+                    }
+                }
+                for custom_id, i in pending.items()
+            ])
+            
+            deadline = time.monotonic() + self.config.get('batch_poll_timeout', 3600)
+            poll_delay = 5
+            while batch.processing_status != 'ended':
+                if time.monotonic() >= deadline:
+                    print(f"[WARNING] Message batch {batch.id} did not finish in time, cancelling")
+                    client.messages.batches.cancel(batch.id)
+                    break
+                time.sleep(poll_delay)
+                poll_delay = min(poll_delay * 2, 60)
+                batch = client.messages.batches.retrieve(batch.id)
+            
+            if batch.processing_status == 'ended':
+                for entry in client.messages.batches.results(batch.id):
+                    i = pending.get(entry.custom_id)
+                    if i is not None and entry.result.type == 'succeeded':
+                        responses[i] = self._cache_response(cache_paths[i], entry.result.message.content[0].text)
+        
+        return [response if response is not None else self._real_llm_call(prompt)
+                for response, prompt in zip(responses, prompts)]
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Truncated exponential backoff with full jitter
+        
+        Spreading retries uniformly over [0, min(cap, base * 2^attempt)] keeps
+        concurrent callers from retrying in lockstep against the rate limiter.
+        """
+        return random.uniform(0, min(self.retry_cap, self.retry_delay * (2 ** attempt)))
+    
+    def _is_retryable_error(self, error: Exception) -> bool:
+        """
+        Whether an LLM call failure is transient
+        
+        Errors carrying an HTTP status are retried only for rate limits,
+        timeouts and server-side failures; client errors such as 400/401 are
+        not. A missing SDK (ImportError) is never retried.
+        """
+        if isinstance(error, ImportError):
+            return False
+        status_code = getattr(error, 'status_code', None)
+        if status_code is not None:
+            return status_code in RETRYABLE_STATUS_CODES
+        # Connection errors and timeouts carry no status
+        return True
+    
+    def _llm_cache_path(self, prompt: str) -> Optional[str]:
+        """
+        Content-addressed cache path for a prompt's response
+        
+        Args:
+            prompt: Input prompt
+            
+        Returns:
+            Cache file path, or None when caching is disabled or the facade is
+            configured with the mock provider (facade calls that fall back to
+            the mock are skipped by _real_llm_call)
+        """
+        if not self.llm_cache_enabled:
+            return None
+        if self.llm_facade and getattr(self.llm_facade, 'provider', None) == 'mock':
+            return None
+        
+        key = hashlib.sha256(f"{self.provider}|{self.model}|0.2|{prompt}".encode('utf-8')).hexdigest()
+        return os.path.join(self.llm_cache_dir, key[:2], key)
+    
+    def _read_llm_cache(self, cache_path: str) -> Optional[str]:
+        """Return a cached response, or None on a miss"""
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def _cache_response(self, cache_path: Optional[str], response: str) -> str:
+        """
+        Store a response in the cache and return it
+        
+        The file is written under a temporary name and moved into place with
+        os.replace, so concurrent readers never see a partial response.
+        """
+        if cache_path:
+            try:
+                cache_dir = os.path.dirname(cache_path)
+                os.makedirs(cache_dir, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        f.write(response)
+                    os.replace(tmp_path, cache_path)
+                except Exception:
+                    os.unlink(tmp_path)
+                    raise
+            except Exception as e:
+                print(f"[WARNING] Could not write LLM cache entry: {e}")
+        return response
+
     def _format_parsed_files(self, parsed_files: List[Dict[str, Any]]) -> str:
         """
         Format parsed file data for LLM hierarchical summary prompt
@@ -494,26 +1350,33 @@ The main runner script coordinates execution across modules, managing dependenci
             if file_docstring:
                 summary_parts.append(f"Purpose: {file_docstring}")
 
-            # Count different types of chunks
-            classes = [c for c in chunks if c.get('chunk_type') == 'class']
-            functions = [c for c in chunks if c.get('chunk_type') in ['function', 'async_function']]
-            methods = [c for c in chunks if c.get('chunk_type') == 'method']
+            # Classify chunks in a single pass
+            classes, functions = [], []
+            method_count = 0
+            for c in chunks:
+                chunk_type = c.get('chunk_type')
+                if chunk_type == 'class':
+                    classes.append(c)
+                elif chunk_type == 'method':
+                    method_count += 1
+                elif chunk_type in FUNC_TYPES:
+                    functions.append(c)
 
             if classes:
-                class_names = [c.get('name', 'Unknown') for c in classes]
-                summary_parts.append(f"Classes ({len(classes)}): {', '.join(class_names)}")
+                class_names = ', '.join(c.get('name', 'Unknown') for c in classes)
+                summary_parts.append(f"Classes ({len(classes)}): {class_names}")
 
             if functions:
-                func_names = [f.get('name', 'Unknown') for f in functions[:5]]  # Limit to 5
+                func_names = [f.get('name', 'Unknown') for f in islice(functions, 5)]  # Limit to 5
                 if len(functions) > 5:
                     func_names.append(f"... +{len(functions) - 5} more")
                 summary_parts.append(f"Functions ({len(functions)}): {', '.join(func_names)}")
 
-            if methods:
-                summary_parts.append(f"Methods: {len(methods)} total")
+            if method_count:
+                summary_parts.append(f"Methods: {method_count} total")
 
             if imports:
-                import_names = [imp.split('.')[-1] for imp in imports[:3]]  # Get module names
+                import_names = [imp.rsplit('.', 1)[-1] for imp in islice(imports, 3)]  # Get module names
                 if len(imports) > 3:
                     import_names.append(f"... +{len(imports) - 3} more")
                 summary_parts.append(f"Imports: {', '.join(import_names)}")
@@ -526,11 +1389,7 @@ The main runner script coordinates execution across modules, managing dependenci
     def _generate_section_points(self, section: Dict[str, Any], summary: str) -> list:
         """Generate key points for a section based on summary"""
         # Simplified version - in real implementation would use LLM
-        return [
-            f"Key point 1 based on summary for {section.get('title')}",
-            f"Key point 2 based on summary for {section.get('title')}",
-            f"Key point 3 based on summary for {section.get('title')}"
-        ]
+        return list(_section_points(SECTION_POINT_TEMPLATE, section.get('title')))
     
     def get_schema(self) -> Dict[str, Any]:
         """Return tool schema"""
@@ -544,7 +1403,18 @@ The main runner script coordinates execution across modules, managing dependenci
                     'parameters': {
                         'file_path': 'Path to the file',
                         'content': 'File content as string',
-                        'use_mock': 'Whether to use mock LLM (optional, default from config)'
+                        'use_mock': 'Whether to use mock LLM (optional, default from config)',
+                        'stream': 'Return summary_stream (iterator of text chunks) instead of summary (optional)'
+                    }
+                },
+                {
+                    'name': 'summarize_files_batch',
+                    'description': 'Generate summaries for many files concurrently',
+                    'parameters': {
+                        'files': "List of {'file_path', 'content'} dictionaries",
+                        'use_mock': 'Whether to use mock LLM (optional, default from config)',
+                        'max_concurrency': 'Maximum concurrent LLM calls (optional, default 8)',
+                        'use_batch_api': 'Use the Message Batches API for large batches (optional, default from config)'
                     }
                 },
                 {
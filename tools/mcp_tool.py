@@ -7,20 +7,38 @@ Foundation for all tools in the system including MCP tools
 from typing import Dict, Any
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from core import json_utils
 from tools.base_tool import BaseTool
 
+# Upper bound on an MCP response body, overridable via config 'max_response_bytes'
+MAX_RESPONSE_BYTES = 64 << 20
+
 
 class MCPTool(BaseTool):
     """Tool that calls MCP server endpoints"""
 
     def __init__(self, tool_name: str, description: str, mcp_url: str,
-                 tool_config: Dict[str, Any], config: Dict[str, Any] = None):
+                 tool_config: Dict[str, Any], config: Dict[str, Any] = None,
+                 session: requests.Session = None):
         super().__init__(tool_name, description, config)
         self.mcp_url = mcp_url
         self.tool_config = tool_config
         self.input_schema = tool_config.get('input_schema', {})
 
+        # Keep-alive session so repeated calls reuse pooled connections;
+        # a session passed in (e.g. the registry's) is shared, not owned
+        self._owns_session = session is None
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['Accept-Encoding'] = 'gzip, deflate'
+        self.session = session
+        self.max_response_bytes = self.config.get('max_response_bytes', MAX_RESPONSE_BYTES)
+
     def execute(self, **kwargs) -> Dict[str, Any]:
         """Execute MCP tool via REST call"""
         try:
@@ -31,22 +49,32 @@ class MCPTool(BaseTool):
             }
 
             # Make REST call to MCP server
-            response = requests.post(
+            with self.session.post(
                 f"{self.mcp_url}/execute",
                 json=payload,
-                timeout=30
-            )
-
-            if response.status_code == 200:
-                return {
-                    'success': True,
-                    'result': response.json()
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': f'MCP call failed: {response.status_code}'
-                }
+                timeout=(10, 30),
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    return {
+                        'success': False,
+                        'error': f'MCP call failed: {response.status_code}'
+                    }
+
+                # Read the (decompressed) body with a size cap, then decode once
+                body = bytearray()
+                for chunk in response.iter_content(chunk_size=1 << 16):
+                    body += chunk
+                    if len(body) > self.max_response_bytes:
+                        return {
+                            'success': False,
+                            'error': f'MCP response exceeds {self.max_response_bytes} bytes'
+                        }
+
+            return {
+                'success': True,
+                'result': json_utils.loads(bytes(body))
+            }
 
         except Exception as e:
             return {
@@ -54,6 +82,11 @@ class MCPTool(BaseTool):
                 'error': str(e)
             }
 
+    def close(self) -> None:
+        """Release pooled connections (unless the session is shared)"""
+        if self._owns_session:
+            self.session.close()
+
     def get_schema(self) -> Dict[str, Any]:
         """Return tool schema"""
         return {
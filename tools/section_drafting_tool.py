@@ -5,10 +5,280 @@ Drafts documentation sections using AI and templates
 © 2025 Model Documentation Integration
 """
 import os
+import re
 import json
-from typing import Dict, Any, List
+import time
+import queue
+import hashlib
+import logging
+import atexit
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple, Callable
+from core import json_utils
 from tools.base_tool import BaseTool
 
+try:
+    import httpx
+    from anthropic import Anthropic
+except ImportError:
+    httpx = None
+    Anthropic = None
+
+logger = logging.getLogger(__name__)
+
+# Anthropic model used for direct API calls
+ANTHROPIC_MODEL = 'claude-sonnet-4-20250514'
+
+# Fixed parts of the section and subsection prompts
+_SECTION_PREAMBLE = """You are a technical documentation expert drafting a section for a BMO Model Documentation.
+
+**Section to Draft:**
+Title: {title}
+Description: {description}
+
+**Section Requirements:**
+- Required: {required}
+- Follow BMO documentation standards
+- Use clear, professional language
+- Include technical details where appropriate
+
+**Context Information:**
+"""
+
+_SECTION_INSTRUCTIONS = """
+
+**Instructions:**
+1. Draft the section content in markdown format
+2. Use appropriate heading levels (## for section, ### for subsections)
+3. Include technical details from the context provided
+4. Follow the subsection structure if specified
+5. Be thorough but concise
+6. Use bullet points, code blocks, and tables where appropriate
+
+Draft the section now:
+"""
+
+_SUBSECTION_PREAMBLE = """You are a technical documentation expert drafting a subsection for BMO Model Documentation.
+
+**Parent Section:** {section_title}
+**Subsection to Draft:**
+Title: {title}
+Description: {description}
+
+**Context Information:**
+"""
+
+_SUBSECTION_INSTRUCTIONS = """
+
+**Instructions:**
+Draft this subsection in markdown format using ### heading level.
+
+Subsection content:
+"""
+
+# Mock-mode section and subsection bodies
+_MOCK_SECTION_TMPL = "## {title}\n\n{description}\n\n"
+
+_MOCK_SECTION_SUBSECTION_TMPL = """### {title}
+
+{description}
+
+**Key Points:**
+- Point 1: Analysis and discussion
+- Point 2: Technical details
+- Point 3: Conclusions and observations
+
+"""
+
+_MOCK_SECTION_OVERVIEW = """**Overview:**
+
+This section provides comprehensive coverage of the topic.
+
+**Key Points:**
+- Point 1: Based on codebase analysis
+- Point 2: Technical implementation details
+- Point 3: Observations and recommendations
+
+"""
+
+_MOCK_SUBSECTION_TMPL = """### {title}
+
+{description}
+
+**Details:**
+- Key aspect 1
+- Key aspect 2
+- Key aspect 3
+
+"""
+
+# {{variable}} placeholders in master prompts
+_VAR_RE = re.compile(r'\{\{(\w+)\}\}')
+
+# Section delimiter the model is asked to use when drafting several sections in one reply
+_MARSHALED_SECTION_RE = re.compile(r'(?m)^[ \t]*===SECTION id="([^"\n]+)"===[ \t]*$')
+
+
+# Rough characters-per-token ratio used to size prompts
+CHARS_PER_TOKEN = 4
+
+# Shortest tail (in tokens) worth adding as a truncated summary
+_MIN_SUMMARY_TOKENS = 32
+
+
+def _estimate_tokens(text: str) -> int:
+    """Approximate token count of a piece of text"""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _pack_summaries(file_summaries, max_tokens: int, sep: str = "\n", path_sep: str = ":\n") -> str:
+    """
+    Pack file summaries into a token budget
+    
+    Entries are added whole in their original order until the next one no
+    longer fits; that one is cut to the remaining budget (if enough is left)
+    and packing stops.
+    
+    Args:
+        file_summaries: Mapping of file path to summary, or a list of summaries
+        max_tokens: Token budget for the packed text
+        sep: Separator between entries
+        path_sep: Separator between a file path and its summary
+        
+    Returns:
+        Packed summaries
+    """
+    if isinstance(file_summaries, dict):
+        entries = (f"{path}{path_sep}{summary}" for path, summary in file_summaries.items())
+    else:
+        entries = (str(summary) for summary in file_summaries)
+    
+    packed = []
+    remaining = max_tokens
+    sep_tokens = _estimate_tokens(sep)
+    for entry in entries:
+        cost = _estimate_tokens(entry) + (sep_tokens if packed else 0)
+        if cost <= remaining:
+            packed.append(entry)
+            remaining -= cost
+            continue
+        remaining -= sep_tokens if packed else 0
+        if remaining >= _MIN_SUMMARY_TOKENS:
+            packed.append(entry[:(remaining - 1) * CHARS_PER_TOKEN] + "...")
+        break
+    return sep.join(packed)
+
+
+# Parsed templates by absolute path, stored as (mtime, template)
+_TEMPLATE_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def _load_template_cached(path: str) -> Dict[str, Any]:
+    """
+    Parse a template JSON file, reusing the parsed copy until the file's mtime changes
+    
+    Raises:
+        OSError: If the file cannot be read
+    """
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime
+    cached = _TEMPLATE_CACHE.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'rb') as f:
+        template = json_utils.loads(f.read())
+    _TEMPLATE_CACHE[path] = (mtime, template)
+    return template
+
+
+# id -> definition indexes of template sections and section subsections, keyed
+# by (id(owner), field) and stored with the owner to detect id reuse
+_ID_INDEXES: "OrderedDict[Tuple[int, str], Tuple[Dict[str, Any], Dict[Any, Dict[str, Any]]]]" = OrderedDict()
+_ID_INDEX_CACHE_SIZE = 256
+_ID_INDEX_LOCK = threading.Lock()
+
+
+def _id_index(owner: Dict[str, Any], field: str) -> Dict[Any, Dict[str, Any]]:
+    """
+    Index owner[field] (a template's sections or a section's subsections) by id;
+    the first definition wins for duplicate ids
+    
+    The index lives in a bounded side map, so shared cached templates and
+    caller-supplied templates are never modified.
+    """
+    key = (id(owner), field)
+    with _ID_INDEX_LOCK:
+        entry = _ID_INDEXES.get(key)
+        if entry is not None and entry[0] is owner:
+            _ID_INDEXES.move_to_end(key)
+            return entry[1]
+    index = {}
+    for item in owner.get(field, []):
+        index.setdefault(item.get('id'), item)
+    with _ID_INDEX_LOCK:
+        _ID_INDEXES[key] = (owner, index)
+        _ID_INDEXES.move_to_end(key)
+        while len(_ID_INDEXES) > _ID_INDEX_CACHE_SIZE:
+            _ID_INDEXES.popitem(last=False)
+    return index
+
+
+class _DebugWriter:
+    """
+    Background writer for debug prompt/output files
+    
+    Writes are queued and performed by one daemon thread, so drafting does not
+    wait on disk I/O. Missing directories are created on the first write into
+    them. Pending writes are flushed at interpreter exit.
+    """
+    _queue: "queue.Queue[Tuple[str, bytes]]" = None
+    _lock = threading.Lock()
+    
+    @classmethod
+    def submit(cls, path: str, data: bytes) -> None:
+        """Queue data to be written to path (replacing any existing file)"""
+        if cls._queue is None:
+            with cls._lock:
+                if cls._queue is None:
+                    write_queue = queue.Queue()
+                    threading.Thread(target=cls._run, args=(write_queue,),
+                                     name='section-debug-writer', daemon=True).start()
+                    atexit.register(write_queue.join)
+                    cls._queue = write_queue
+        cls._queue.put((path, data))
+    
+    @classmethod
+    def flush(cls) -> None:
+        """Block until every queued write has been performed"""
+        if cls._queue is not None:
+            cls._queue.join()
+    
+    @classmethod
+    def _run(cls, write_queue: "queue.Queue[Tuple[str, bytes]]") -> None:
+        while True:
+            path, data = write_queue.get()
+            try:
+                flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+                try:
+                    fd = os.open(path, flags, 0o644)
+                except FileNotFoundError:
+                    # First write into this directory
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    fd = os.open(path, flags, 0o644)
+                try:
+                    view = memoryview(data)
+                    while view:
+                        view = view[os.write(fd, view):]
+                finally:
+                    os.close(fd)
+            except Exception:
+                pass
+            finally:
+                write_queue.task_done()
+
 
 class SectionDraftingTool(BaseTool):
     """Tool for drafting documentation sections using templates and LLM"""
@@ -21,14 +291,56 @@ class SectionDraftingTool(BaseTool):
         self.use_mock = config.get('use_mock', False)
         self.provider = config.get('provider', 'anthropic')
         self.model = config.get('model', 'claude-sonnet-4.5')
+        self.prompt_cache = config.get('prompt_cache', True)
+        
+        # LLM responses keyed by prompt hash, so repeated prompts skip the network
+        self._response_cache: Dict[str, str] = {}
+        
+        # Compiled prompt builders by section id, stored as (section_def,
+        # template_prompts, builder); kept per instance because the builders
+        # depend on this instance's config and templates are shared between instances
+        self._prompt_builders: Dict[str, Tuple[Dict[str, Any], Any, Callable[[Dict[str, Any]], str]]] = {}
         
         # Load template
         self.template = self._load_template()
         
+        # Direct Anthropic client, built on first use and shared by all calls
+        self._anthropic_client = None
+        self._anthropic_client_lock = threading.Lock()
+        
         # Initialize LLM Facade
         self.llm_facade = None
         self._initialize_llm_facade()
     
+    def clear_cache(self) -> None:
+        """Forget cached LLM responses"""
+        self._response_cache.clear()
+    
+    @staticmethod
+    def _prompt_key(prompt: str) -> str:
+        """Response cache key for a prompt"""
+        return hashlib.blake2b(prompt.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+    
+    def _cache_response(self, prompt: str, response: str) -> str:
+        """Remember a successful response (when prompt caching is enabled) and return it"""
+        if self.prompt_cache:
+            self._response_cache[self._prompt_key(prompt)] = response
+        return response
+    
+    def _get_anthropic_client(self):
+        """Return the shared Anthropic client (and its connection pool), creating it on first use"""
+        if self._anthropic_client is None:
+            with self._anthropic_client_lock:
+                if self._anthropic_client is None:
+                    if Anthropic is None:
+                        raise ImportError("anthropic package is required for direct API calls")
+                    self._anthropic_client = Anthropic(
+                        api_key=os.environ['ANTHROPIC_API_KEY'],
+                        max_retries=2,
+                        timeout=httpx.Timeout(self.config.get('http_timeout', 600.0), connect=5.0)
+                    )
+        return self._anthropic_client
+    
     def _initialize_llm_facade(self):
         """Initialize LLM Facade for API calls"""
         try:
@@ -38,10 +350,10 @@ class SectionDraftingTool(BaseTool):
             # Test if API key is available
             api_key = os.environ.get('ANTHROPIC_API_KEY')
             if not api_key and not self.use_mock:
-                print("[WARNING] ANTHROPIC_API_KEY not set, will use mock mode")
+                logger.warning("ANTHROPIC_API_KEY not set, will use mock mode")
                 self.use_mock = True
         except Exception as e:
-            print(f"[WARNING] Could not initialize LLM Facade: {e}. Using mock mode.")
+            logger.warning(f"Could not initialize LLM Facade: {e}. Using mock mode.")
             self.llm_facade = None
             if not self.use_mock:
                 self.use_mock = True
@@ -53,15 +365,15 @@ class SectionDraftingTool(BaseTool):
         if not os.path.exists(template_path):
             raise FileNotFoundError(f"Template not found: {template_path}")
         
-        with open(template_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return _load_template_cached(template_path)
     
     def execute(self, action: str, **kwargs) -> Dict[str, Any]:
         """
         Execute section drafting operations
         
         Args:
-            action: Operation to perform (draft_section, draft_subsection, draft_from_template)
+            action: Operation to perform (draft_section, draft_subsection, draft_subsections,
+                    draft_from_template)
             **kwargs: Action-specific parameters
             
         Returns:
@@ -72,6 +384,8 @@ class SectionDraftingTool(BaseTool):
                 return self._draft_section(**kwargs)
             elif action == "draft_subsection":
                 return self._draft_subsection(**kwargs)
+            elif action == "draft_subsections":
+                return self._draft_subsections(**kwargs)
             elif action == "draft_from_template":
                 return self._draft_from_template(**kwargs)
             else:
@@ -109,9 +423,10 @@ class SectionDraftingTool(BaseTool):
             # If it's not a path reference, resolve within templates_dir and add .json
             if not os.path.isabs(candidate_path) and os.sep not in candidate_path:
                 candidate_path = os.path.join(self.templates_dir, f'{template_name}.json')
-            if os.path.exists(candidate_path):
-                with open(candidate_path, 'r', encoding='utf-8') as f:
-                    template_to_use = json.load(f)
+            try:
+                template_to_use = _load_template_cached(candidate_path)
+            except OSError:
+                pass
         
         # Find section in template
         section_def = self._find_section(section_id, template_to_use)
@@ -123,40 +438,39 @@ class SectionDraftingTool(BaseTool):
         
         # Build prompt for section
         # Inject template prompt controls into context if available
-        try:
-            template_prompts = (template_to_use or {}).get('prompts', {})
+        if template_to_use:
+            template_prompts = template_to_use.get('prompts')
             if template_prompts:
-                context = dict(context or {})
-                context['template_prompts'] = template_prompts
-        except Exception:
-            pass
+                context = {**(context or {}), 'template_prompts': template_prompts}
 
-        prompt = self._build_section_prompt(section_def, context)
+        # Mock drafts don't use the prompt; build it for them only as a debug artifact
+        if not use_mock or debug_dir:
+            prompt = self._build_section_prompt(section_def, context)
 
         # Debug: write prompt
         if debug_dir:
             try:
-                import os
-                os.makedirs(debug_dir, exist_ok=True)
                 fn = f"section_{section_def.get('id','section')}_prompt.txt"
-                with open(os.path.join(debug_dir, fn), 'w', encoding='utf-8') as f:
-                    f.write(prompt)
+                _DebugWriter.submit(os.path.join(debug_dir, fn), prompt.encode('utf-8', 'replace'))
             except Exception:
                 pass
         
-        # Generate content
+        # Generate content; direct API output is streamed straight into the debug file
+        output_streamed = False
         if use_mock:
             content = self._mock_draft_section(section_def, context)
+        elif debug_dir and self._can_stream():
+            fn = f"section_{section_def.get('id','section')}_output.md"
+            content = self._llm_draft_section_streaming(prompt, os.path.join(debug_dir, fn))
+            output_streamed = True
         else:
             content = self._llm_draft_section(prompt)
         
         # Debug: write content
-        if debug_dir:
+        if debug_dir and not output_streamed:
             try:
-                import os
                 fn = f"section_{section_def.get('id','section')}_output.md"
-                with open(os.path.join(debug_dir, fn), 'w', encoding='utf-8') as f:
-                    f.write(content)
+                _DebugWriter.submit(os.path.join(debug_dir, fn), content.encode('utf-8', 'replace'))
             except Exception:
                 pass
 
@@ -201,8 +515,9 @@ class SectionDraftingTool(BaseTool):
                 'error': f'Subsection not found: {subsection_id}'
             }
         
-        # Build prompt
-        prompt = self._build_subsection_prompt(section_def, subsection_def, context)
+        # Build prompt (mock drafts only need it as a debug artifact)
+        if not use_mock or debug_dir:
+            prompt = self._build_subsection_prompt(section_def, subsection_def, context)
         
         # Generate content
         if use_mock:
@@ -213,12 +528,9 @@ class SectionDraftingTool(BaseTool):
         # Debug: write prompt/content
         if debug_dir:
             try:
-                import os
-                os.makedirs(debug_dir, exist_ok=True)
-                with open(os.path.join(debug_dir, f"{section_id}_{subsection_id}_prompt.txt"), 'w', encoding='utf-8') as f:
-                    f.write(prompt)
-                with open(os.path.join(debug_dir, f"{section_id}_{subsection_id}_output.md"), 'w', encoding='utf-8') as f:
-                    f.write(content)
+                fn = f"{section_id}_{subsection_id}"
+                _DebugWriter.submit(os.path.join(debug_dir, f"{fn}_prompt.txt"), prompt.encode('utf-8', 'replace'))
+                _DebugWriter.submit(os.path.join(debug_dir, f"{fn}_output.md"), content.encode('utf-8', 'replace'))
             except Exception:
                 pass
         
@@ -231,6 +543,69 @@ class SectionDraftingTool(BaseTool):
             'mock_mode': use_mock
         }
     
+    def _draft_subsections(self, section_id: str, context: Dict[str, Any],
+                           subsection_ids: List[str] = None, use_mock: bool = None,
+                           debug_dir: str = None, workflow_id: str = None, node_id: str = None) -> Dict[str, Any]:
+        """
+        Draft several subsections of one section
+        
+        Real-mode subsections are independent LLM calls, so they are drafted on
+        a thread pool of up to 'max_concurrency' workers.
+        
+        Args:
+            section_id: Parent section identifier
+            context: Context data
+            subsection_ids: Subsections to draft (default: all of the section's subsections)
+            use_mock: Whether to use mock LLM
+            debug_dir: Directory for prompt/output debug files (optional)
+            
+        Returns:
+            Dictionary with drafted subsections keyed by subsection ID
+        """
+        if use_mock is None:
+            use_mock = self.use_mock
+        
+        section_def = self._find_section(section_id)
+        if not section_def:
+            return {
+                'success': False,
+                'error': f'Section not found: {section_id}'
+            }
+        
+        if subsection_ids is None:
+            subsection_ids = [s.get('id') for s in section_def.get('subsections', []) or []]
+        
+        def draft(subsection_id: str) -> Dict[str, Any]:
+            return self._draft_subsection(section_id, subsection_id, context, use_mock=use_mock,
+                                          debug_dir=debug_dir, workflow_id=workflow_id, node_id=node_id)
+        
+        max_workers = min(self.config.get('max_concurrency', 8), len(subsection_ids))
+        if use_mock or max_workers <= 1:
+            results = [draft(subsection_id) for subsection_id in subsection_ids]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='subsection-draft') as executor:
+                results = list(executor.map(draft, subsection_ids))
+        
+        drafted_subsections = {}
+        errors = []
+        for subsection_id, result in zip(subsection_ids, results):
+            if result['success']:
+                drafted_subsections[subsection_id] = result
+            else:
+                errors.append(f"{subsection_id}: {result.get('error')}")
+        
+        if debug_dir:
+            _DebugWriter.flush()
+        
+        return {
+            'success': len(errors) == 0,
+            'section_id': section_id,
+            'subsections': drafted_subsections,
+            'subsections_drafted': len(drafted_subsections),
+            'errors': errors if errors else None,
+            'mock_mode': use_mock
+        }
+    
     def _draft_from_template(self, context: Dict[str, Any], 
                             sections_to_draft: List[str] = None,
                             use_mock: bool = None,
@@ -256,9 +631,13 @@ class SectionDraftingTool(BaseTool):
             candidate_path = template_name
             if not os.path.isabs(candidate_path) and os.sep not in candidate_path:
                 candidate_path = os.path.join('data/templates', f'{template_name}.json')
-            if os.path.exists(candidate_path):
-                with open(candidate_path, 'r', encoding='utf-8') as f:
-                    template_to_use = json.load(f)
+            try:
+                template_to_use = _load_template_cached(candidate_path)
+            except OSError:
+                pass
+
+        # Context pieces shared by every section prompt are computed once
+        context = self._prepare_run_context(context)
 
         # Determine which sections to draft
         if sections_to_draft is None:
@@ -267,17 +646,42 @@ class SectionDraftingTool(BaseTool):
             all_ids = [s['id'] for s in template_to_use.get('sections', [])]
             sections_to_draft = required_ids if required_ids else all_ids
         
+        # Submit all sections as one Message Batches job when enabled
+        batch_results = None
+        if not use_mock and self._use_batch_api(len(sections_to_draft)):
+            try:
+                batch_results = self._draft_sections_via_batch_api(sections_to_draft, context, template_to_use, debug_dir)
+            except Exception as e:
+                logger.warning(f"Message Batches API failed ({e}), drafting sections individually")
+        
+        # Optionally pack several sections into each LLM call
+        if batch_results is None and not use_mock and self.config.get('marshal_sections', False):
+            batch_results = self._draft_sections_marshaled(sections_to_draft, context, template_to_use, debug_dir)
+        
+        # Real-mode sections are independent, so draft them concurrently
+        if batch_results is None and not use_mock and len(sections_to_draft) > 1 and not self._in_event_loop():
+            batch_results = asyncio.run(self._adraft_from_template(
+                sections_to_draft, context, template_name=template_name, debug_dir=debug_dir,
+                workflow_id=workflow_id, node_id=node_id))
+        
         # Draft each section
         drafted_sections = {}
         errors = []
         
         for section_id in sections_to_draft:
-            result = self._draft_section(section_id, context, template_name=template_name, use_mock=use_mock, debug_dir=debug_dir, workflow_id=workflow_id, node_id=node_id)
+            if batch_results is not None:
+                result = batch_results[section_id]
+            else:
+                result = self._draft_section(section_id, context, template_name=template_name, use_mock=use_mock, debug_dir=debug_dir, workflow_id=workflow_id, node_id=node_id)
             if result['success']:
                 drafted_sections[section_id] = result
             else:
                 errors.append(f"{section_id}: {result.get('error')}")
         
+        # Debug files for the whole run are on disk when it returns
+        if debug_dir:
+            _DebugWriter.flush()
+        
         return {
             'success': len(errors) == 0,
             'sections': drafted_sections,
@@ -286,22 +690,319 @@ class SectionDraftingTool(BaseTool):
             'mock_mode': use_mock
         }
     
+    async def _adraft_from_template(self, section_ids: List[str], context: Dict[str, Any],
+                                    template_name: str = None, debug_dir: str = None,
+                                    workflow_id: str = None, node_id: str = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Draft real-mode sections concurrently
+        
+        The LLM facade is synchronous, so each section is drafted in a worker
+        thread; at most 'max_concurrency' sections are in flight at once.
+        
+        Args:
+            section_ids: Section identifiers to draft
+            context: Context data for all sections
+            template_name: Template name or path (optional)
+            debug_dir: Directory for prompt/output debug files (optional)
+            
+        Returns:
+            Dictionary mapping section ID to its draft result
+        """
+        semaphore = asyncio.Semaphore(self.config.get('max_concurrency', 8))
+        
+        async def _bounded(section_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(
+                        self._draft_section, section_id, context, template_name=template_name,
+                        use_mock=False, debug_dir=debug_dir, workflow_id=workflow_id, node_id=node_id)
+                except Exception as e:
+                    return {
+                        'success': False,
+                        'error': f'Section drafting error: {str(e)}'
+                    }
+        
+        results = await asyncio.gather(*[_bounded(section_id) for section_id in section_ids])
+        return dict(zip(section_ids, results))
+    
+    @staticmethod
+    def _in_event_loop() -> bool:
+        """Whether the caller is already running inside an asyncio event loop"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
+    
+    def _use_batch_api(self, sections_count: int) -> bool:
+        """
+        Whether real-mode sections should be drafted through the Message Batches API
+        
+        Batches are billed at half price but can take minutes to hours to finish,
+        so the path is opt-in ('use_batch_api') and needs more than one section
+        and a direct Anthropic API key.
+        """
+        return (bool(self.config.get('use_batch_api', False))
+                and sections_count > 1
+                and self.provider == 'anthropic'
+                and bool(os.environ.get('ANTHROPIC_API_KEY')))
+    
+    def _draft_sections_via_batch_api(self, section_ids: List[str], context: Dict[str, Any],
+                                      template: Dict[str, Any], debug_dir: str = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Draft several sections with one Message Batches API submission
+        
+        Args:
+            section_ids: Section identifiers to draft
+            context: Context data for all sections
+            template: Template holding the section definitions and prompts
+            debug_dir: Directory for prompt/output debug files (optional)
+            
+        Returns:
+            Dictionary mapping section ID to its draft result
+        """
+        results, section_defs, context = self._resolve_sections(section_ids, context, template)
+        prompts = {section_id: self._build_section_prompt(section_def, context)
+                   for section_id, section_def in section_defs.items()}
+        
+        contents = self._llm_draft_sections_batch(prompts) if prompts else {}
+        
+        results.update(self._section_results(section_defs, prompts, contents, debug_dir))
+        return results
+    
+    def _draft_sections_marshaled(self, section_ids: List[str], context: Dict[str, Any],
+                                  template: Dict[str, Any], debug_dir: str = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Draft sections in groups of 'marshal_batch_size', one LLM call per group
+        
+        Each group shares a single context block; the reply is split on the
+        section delimiters, and any section missing from it is drafted on its own.
+        
+        Args:
+            section_ids: Section identifiers to draft
+            context: Context data for all sections
+            template: Template holding the section definitions and prompts
+            debug_dir: Directory for prompt/output debug files (optional)
+            
+        Returns:
+            Dictionary mapping section ID to its draft result
+        """
+        results, section_defs, context = self._resolve_sections(section_ids, context, template)
+        batch_size = max(1, self.config.get('marshal_batch_size', 4))
+        defs = list(section_defs.values())
+        
+        prompts = {}
+        contents = {}
+        for start in range(0, len(defs), batch_size):
+            group = defs[start:start + batch_size]
+            group_ids = [section_def['id'] for section_def in group]
+            if len(group) > 1:
+                prompt = self._build_marshaled_prompt(group, context)
+                drafted = self._parse_marshaled_response(self._llm_draft_section(prompt))
+            else:
+                prompt, drafted = None, {}
+            for section_id, section_def in zip(group_ids, group):
+                if drafted.get(section_id):
+                    prompts[section_id] = prompt
+                    contents[section_id] = drafted[section_id]
+                else:
+                    prompts[section_id] = self._build_section_prompt(section_def, context)
+                    contents[section_id] = self._llm_draft_section(prompts[section_id])
+        
+        results.update(self._section_results(section_defs, prompts, contents, debug_dir))
+        return results
+    
+    def _resolve_sections(self, section_ids: List[str], context: Dict[str, Any], template: Dict[str, Any]):
+        """
+        Look up section definitions and attach the template's prompt controls to the context
+        
+        Returns:
+            Tuple of (error results for unknown sections, section definitions by ID, prompt context)
+        """
+        template_prompts = (template or {}).get('prompts', {})
+        if template_prompts:
+            context = dict(context or {})
+            context['template_prompts'] = template_prompts
+        
+        results = {}
+        section_defs = {}
+        for section_id in section_ids:
+            section_def = self._find_section(section_id, template)
+            if not section_def:
+                results[section_id] = {
+                    'success': False,
+                    'error': f'Section not found in template: {section_id}'
+                }
+                continue
+            section_defs[section_id] = section_def
+        return results, section_defs, context
+    
+    def _section_results(self, section_defs: Dict[str, Dict[str, Any]], prompts: Dict[str, str],
+                         contents: Dict[str, str], debug_dir: str = None) -> Dict[str, Dict[str, Any]]:
+        """Build real-mode section results, writing debug prompt/output files if requested"""
+        results = {}
+        for section_id, section_def in section_defs.items():
+            content = contents[section_id]
+            if debug_dir:
+                fn = f"section_{section_def.get('id','section')}"
+                _DebugWriter.submit(os.path.join(debug_dir, f"{fn}_prompt.txt"),
+                                    prompts[section_id].encode('utf-8', 'replace'))
+                _DebugWriter.submit(os.path.join(debug_dir, f"{fn}_output.md"), content.encode('utf-8', 'replace'))
+            results[section_id] = {
+                'success': True,
+                'section_id': section_id,
+                'title': section_def.get('title'),
+                'content': content,
+                'mock_mode': False
+            }
+        
+        return results
+    
+    def _llm_draft_sections_batch(self, prompts: Dict[str, str]) -> Dict[str, str]:
+        """
+        Run section prompts through the Anthropic Message Batches API
+        
+        Cached responses are reused and only the remaining prompts are
+        submitted. The batch is polled with exponential backoff until it ends
+        or 'batch_poll_timeout' seconds pass (then it is cancelled). Sections
+        without a successful batch result are drafted one at a time.
+        
+        Args:
+            prompts: Dictionary mapping section ID to prompt
+            
+        Returns:
+            Dictionary mapping section ID to drafted content
+        """
+        client = self._get_anthropic_client()
+        
+        contents = {}
+        if self.prompt_cache:
+            for section_id, prompt in prompts.items():
+                cached = self._response_cache.get(self._prompt_key(prompt))
+                if cached is not None:
+                    contents[section_id] = cached
+        
+        # custom_id must be short and alphanumeric, so index the sections
+        section_ids = [section_id for section_id in prompts if section_id not in contents]
+        if not section_ids:
+            return contents
+        
+        batch = client.messages.batches.create(requests=[
+            {
+                "custom_id": f"s{i}",
+                "params": {
+                    "model": ANTHROPIC_MODEL,
+                    "max_tokens": 4096,
+                    "temperature": 0.3,
+                    "messages": [{"role": "user", "content": prompts[section_id]}]
+                }
+            }
+            for i, section_id in enumerate(section_ids)
+        ])
+        
+        deadline = time.monotonic() + self.config.get('batch_poll_timeout', 3600)
+        poll_delay = 5
+        while batch.processing_status != 'ended':
+            if time.monotonic() >= deadline:
+                logger.warning(f"Message batch {batch.id} did not finish in time, cancelling")
+                client.messages.batches.cancel(batch.id)
+                break
+            time.sleep(poll_delay)
+            poll_delay = min(poll_delay * 2, 60)
+            batch = client.messages.batches.retrieve(batch.id)
+        
+        if batch.processing_status == 'ended':
+            for entry in client.messages.batches.results(batch.id):
+                if entry.result.type == 'succeeded' and entry.custom_id.startswith('s'):
+                    index = int(entry.custom_id[1:])
+                    if index < len(section_ids):
+                        section_id = section_ids[index]
+                        contents[section_id] = self._cache_response(
+                            prompts[section_id], entry.result.message.content[0].text)
+        
+        for section_id, prompt in prompts.items():
+            if section_id not in contents:
+                contents[section_id] = self._llm_draft_section(prompt)
+        return contents
+    
     def _find_section(self, section_id: str, template: Dict[str, Any] = None) -> Dict[str, Any]:
         """Find section definition in template"""
         if template is None:
             template = self.template
-        for section in template.get('sections', []):
-            if section.get('id') == section_id:
-                return section
-        return None
+        return _id_index(template, 'sections').get(section_id)
     
     def _find_subsection(self, section_def: Dict[str, Any], 
                         subsection_id: str) -> Dict[str, Any]:
         """Find subsection definition in section"""
-        for subsection in section_def.get('subsections', []):
-            if subsection.get('id') == subsection_id:
-                return subsection
-        return None
+        return _id_index(section_def, 'subsections').get(subsection_id)
+    
+    def _prepare_run_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy a drafting run's context and precompute the parts every section prompt shares
+        
+        Adds '_metadata_json' (context['metadata'] serialized once) when the
+        metadata is JSON-serializable, and the file summary snippets used by
+        the master prompt ('_compact_file_summaries') and the legacy prompt
+        ('_file_summaries_block').
+        """
+        context = dict(context or {})
+        if 'metadata' in context:
+            try:
+                context['_metadata_json'] = json.dumps(context['metadata'], indent=2)
+            except Exception:
+                pass
+        context['_compact_file_summaries'] = self._compact_file_summaries(context)
+        if isinstance(context.get('file_summaries'), dict):
+            context['_file_summaries_block'] = self._file_summaries_block(context)
+        return context
+    
+    def _summary_token_budget(self, context: Dict[str, Any]) -> int:
+        """
+        Tokens for file summaries in a section prompt
+        
+        'summary_tokens' (default 1000, about what five 800-character
+        summaries took) caps the budget, since the summaries are repeated in
+        every section prompt; it shrinks further if the shared context leaves
+        less room under max_prompt_tokens.
+        """
+        used = self.config.get('prompt_reserve_tokens', 2000)
+        used += _estimate_tokens(str(context.get('hierarchical_summary', '') or ''))
+        metadata_json = context.get('_metadata_json')
+        if metadata_json is not None:
+            used += _estimate_tokens(metadata_json)
+        return max(0, min(self.config.get('summary_tokens', 1000),
+                          self.config.get('max_prompt_tokens', 16000) - used))
+    
+    def _compact_file_summaries(self, context: Dict[str, Any]) -> str:
+        """File summaries packed into the section prompt's token budget (master prompt form)"""
+        cached = context.get('_compact_file_summaries')
+        if cached is not None:
+            return cached
+        fs = context.get('file_summaries')
+        try:
+            if fs and isinstance(fs, dict):
+                return _pack_summaries(fs, self._summary_token_budget(context))
+            if fs and isinstance(fs, list):
+                return _pack_summaries(fs, self._summary_token_budget(context), sep="\n\n")
+        except Exception:
+            pass
+        return ''
+    
+    def _file_summaries_block(self, context: Dict[str, Any]) -> str:
+        """File summaries packed into the section prompt's token budget (legacy prompt form)"""
+        cached = context.get('_file_summaries_block')
+        if cached is not None:
+            return cached
+        packed = _pack_summaries(context['file_summaries'], self._summary_token_budget(context), sep="\n\n")
+        return f"\n{packed}\n" if packed else ""
+    
+    @staticmethod
+    def _metadata_json(context: Dict[str, Any]) -> str:
+        """context['metadata'] as indented JSON, reusing the per-run serialization when present"""
+        metadata_json = context.get('_metadata_json')
+        if metadata_json is None:
+            metadata_json = json.dumps(context['metadata'], indent=2)
+        return metadata_json
     
     def _build_section_prompt(self, section_def: Dict[str, Any], 
                              context: Dict[str, Any]) -> str:
@@ -309,12 +1010,34 @@ class SectionDraftingTool(BaseTool):
         Prefers a single master prompt (prompts.master_prompt_text). Falls back to
         legacy prefix/suffix/overrides if master is not present.
         """
-        template_prompts = context.get('template_prompts', {}) or {}
+        template_prompts = context.get('template_prompts') or None
+        section_id = section_def.get('id')
+        compiled = self._prompt_builders.get(section_id)
+        if compiled is None or compiled[0] is not section_def or compiled[1] is not template_prompts:
+            compiled = (section_def, template_prompts,
+                        self._compile_section_prompt(section_def, template_prompts or {}))
+            self._prompt_builders[section_id] = compiled
+        return compiled[2](context)
+
+    def _compile_section_prompt(self, section_def: Dict[str, Any],
+                                template_prompts: Dict[str, Any]) -> Callable[[Dict[str, Any]], str]:
+        """
+        Specialize the prompt builder for one section of a template
 
+        Everything derived from the section definition and the template prompts
+        is rendered once here; the returned function only fills in the
+        context-dependent parts.
+
+        Args:
+            section_def: Section definition from the template
+            template_prompts: The template's 'prompts' block
+
+        Returns:
+            Function mapping a drafting context to the section prompt
+        """
         # 1) If master prompt provided, render it with variables and return
         master_prompt = template_prompts.get('master_prompt_text', '') or ''
         if master_prompt.strip():
-            # Build variables
             section_title = section_def.get('title', section_def.get('id', 'Section'))
             # Build requirements string from description + subsections
             requirements_parts = []
@@ -325,47 +1048,54 @@ class SectionDraftingTool(BaseTool):
                 sub_lines = [f"- {s.get('title', s.get('id'))}: {s.get('description','').strip()}" for s in subs]
                 requirements_parts.append("Subsections to cover:\n" + "\n".join(sub_lines))
             section_requirements = "\n".join([p for p in requirements_parts if p]) or "List the essential points relevant to this section."
-
-            # Repo summary
-            repo_summary = context.get('hierarchical_summary', '') or ''
-
-            # File summaries (compact)
-            file_summaries = ''
-            fs = context.get('file_summaries')
-            try:
-                if fs and isinstance(fs, dict):
-                    items = list(fs.items())[:5]
-                    file_summaries = "\n".join([f"{path}:\n{str(summary)[:800]}" for path, summary in items])
-                elif fs and isinstance(fs, list):
-                    items = fs[:5]
-                    file_summaries = "\n\n".join([str(x)[:800] for x in items])
-            except Exception:
-                file_summaries = ''
-
-            # Metadata string
-            metadata = context.get('metadata') or {}
-            try:
-                metadata_str = json.dumps(metadata, indent=2)
-            except Exception:
-                metadata_str = str(metadata)
-
-            max_words = (template_prompts.get('max_words')
-                         or metadata.get('max_words')
-                         or 600)
-
-            # Simple {{var}} substitution
-            variables = {
+            static_vars = {
                 'section_title': section_title,
                 'section_requirements': section_requirements,
-                'repo_summary': repo_summary,
-                'file_summaries': file_summaries,
-                'metadata': metadata_str,
-                'max_words': str(max_words),
             }
-            rendered = master_prompt
-            for key, val in variables.items():
-                rendered = rendered.replace(f"{{{{{key}}}}}", str(val))
-            return rendered
+            context_vars = ('repo_summary', 'file_summaries', 'metadata', 'max_words')
+
+            # Split the {{var}} template into literal text and context slots
+            pieces = []
+            literal = []
+            pos = 0
+            for m in _VAR_RE.finditer(master_prompt):
+                literal.append(master_prompt[pos:m.start()])
+                name = m.group(1)
+                if name in static_vars:
+                    literal.append(str(static_vars[name]))
+                elif name in context_vars:
+                    pieces.append(("".join(literal), name))
+                    literal = []
+                else:
+                    literal.append(m.group(0))
+                pos = m.end()
+            literal.append(master_prompt[pos:])
+            trailer = "".join(literal)
+            template_max_words = template_prompts.get('max_words')
+
+            def render_master(context: Dict[str, Any]) -> str:
+                metadata = context.get('metadata') or {}
+                try:
+                    metadata_str = self._metadata_json(context) if metadata else json.dumps(metadata, indent=2)
+                except Exception:
+                    metadata_str = str(metadata)
+                max_words = (template_max_words
+                             or metadata.get('max_words')
+                             or 600)
+                variables = {
+                    'repo_summary': context.get('hierarchical_summary', '') or '',
+                    'file_summaries': self._compact_file_summaries(context),
+                    'metadata': metadata_str,
+                    'max_words': str(max_words),
+                }
+                parts = []
+                for text, name in pieces:
+                    parts.append(text)
+                    parts.append(str(variables[name]))
+                parts.append(trailer)
+                return "".join(parts)
+
+            return render_master
 
         # 2) Legacy behavior: prefix/suffix/overrides
         prompt_prefix = template_prompts.get('section_prompt_prefix', '') or ''
@@ -373,95 +1103,130 @@ class SectionDraftingTool(BaseTool):
         overrides = template_prompts.get('overrides', {}) or {}
         section_override = overrides.get(section_def.get('id', ''), '') or ''
 
-        core = f"""You are a technical documentation expert drafting a section for a BMO Model Documentation.
-
-**Section to Draft:**
-Title: {section_def.get('title')}
-Description: {section_def.get('description')}
+        head = _SECTION_PREAMBLE.format_map({
+            'title': section_def.get('title'),
+            'description': section_def.get('description'),
+            'required': section_def.get('required', False)
+        })
+        tail_parts = []
+        # Add subsections structure if present
+        if 'subsections' in section_def:
+            tail_parts.append("\n**Subsections to Cover:**\n")
+            for subsection in section_def['subsections']:
+                tail_parts.append(f"- {subsection.get('title')}: {subsection.get('description')}\n")
+        tail_parts.append(_SECTION_INSTRUCTIONS)
+        # The instructions always end the core text, so only its tail needs trimming
+        tail = "".join(tail_parts).rstrip()
+        prefix = prompt_prefix.strip() + "\n\n" if prompt_prefix.strip() else ''
+        override = section_override.strip()
+        suffix = prompt_suffix.strip()
 
-**Section Requirements:**
-- Required: {section_def.get('required', False)}
-- Follow BMO documentation standards
-- Use clear, professional language
-- Include technical details where appropriate
+        def render_legacy(context: Dict[str, Any]) -> str:
+            core_parts = [head]
+            # Add file summaries if available
+            if 'file_summaries' in context:
+                core_parts.append("\n**File Summaries:**\n")
+                core_parts.append(self._file_summaries_block(context))
+            # Add hierarchical summary if available
+            if 'hierarchical_summary' in context:
+                core_parts.append(f"\n**Overall Codebase Summary:**\n{context['hierarchical_summary']}\n")
+            # Add metadata if available
+            if 'metadata' in context:
+                core_parts.append(f"\n**Project Metadata:**\n{self._metadata_json(context)}\n")
+            core_parts.append(tail)
+            core = "".join(core_parts).lstrip()
+            # Compose with prefix/suffix/overrides
+            return prefix + "\n\n".join([p for p in (override, core, suffix) if p])
 
-**Context Information:**
-"""
+        return render_legacy
+    
+    def _build_marshaled_prompt(self, section_defs: List[Dict[str, Any]], context: Dict[str, Any]) -> str:
+        """Build one LLM prompt that drafts several sections over a shared context block"""
+        template_prompts = context.get('template_prompts', {}) or {}
+        prompt_prefix = template_prompts.get('section_prompt_prefix', '') or ''
+        prompt_suffix = template_prompts.get('section_prompt_suffix', '') or ''
+        
+        parts = []
+        if prompt_prefix.strip():
+            parts.append(prompt_prefix.strip() + "\n")
+        parts.append("You are a technical documentation expert drafting several sections for a BMO Model Documentation.\n")
+        parts.append("**Context Information:**")
         
-        # Add file summaries if available
         if 'file_summaries' in context:
-            core += "\n**File Summaries:**\n"
-            for file_path, summary in list(context['file_summaries'].items())[:5]:
-                core += f"\n{file_path}:\n{summary}\n"
+            parts.append("\n**File Summaries:**\n" + self._file_summaries_block(context).rstrip("\n"))
         
-        # Add hierarchical summary if available
         if 'hierarchical_summary' in context:
-            core += f"\n**Overall Codebase Summary:**\n{context['hierarchical_summary']}\n"
+            parts.append(f"\n**Overall Codebase Summary:**\n{context['hierarchical_summary']}")
         
-        # Add metadata if available
         if 'metadata' in context:
-            core += f"\n**Project Metadata:**\n{json.dumps(context['metadata'], indent=2)}\n"
+            parts.append(f"\n**Project Metadata:**\n{self._metadata_json(context)}")
         
-        # Add subsections structure if present
-        if 'subsections' in section_def:
-            core += "\n**Subsections to Cover:**\n"
-            for subsection in section_def['subsections']:
-                core += f"- {subsection.get('title')}: {subsection.get('description')}\n"
+        parts.append("\n**Sections to Draft:**")
+        for section_def in section_defs:
+            parts.append(f'<<<SECTION id="{section_def.get("id")}">>>')
+            parts.append(f"Title: {section_def.get('title')}")
+            parts.append(f"Description: {section_def.get('description')}")
+            if section_def.get('subsections'):
+                parts.append("Subsections to Cover:")
+                for subsection in section_def['subsections']:
+                    parts.append(f"- {subsection.get('title')}: {subsection.get('description')}")
+            parts.append("<<<END>>>")
         
-        core += """
-
+        parts.append("""
 **Instructions:**
-1. Draft the section content in markdown format
+1. Draft each section's content in markdown format
 2. Use appropriate heading levels (## for section, ### for subsections)
 3. Include technical details from the context provided
 4. Follow the subsection structure if specified
 5. Be thorough but concise
 6. Use bullet points, code blocks, and tables where appropriate
 
-Draft the section now:
-"""
-        # Compose with prefix/suffix/overrides
-        parts = []
-        if prompt_prefix:
-            parts.append(prompt_prefix.strip())
-        if section_override:
-            parts.append(section_override.strip())
-        parts.append(core.strip())
-        if prompt_suffix:
-            parts.append(prompt_suffix.strip())
-        return "\n\n".join([p for p in parts if p])
+Reply with one block per section, in the order given. Start each block with a line of the form
+===SECTION id="<section id>"===
+followed by that section's markdown.""")
+        if prompt_suffix.strip():
+            parts.append("\n" + prompt_suffix.strip())
+        return "\n".join(parts)
+    
+    @staticmethod
+    def _parse_marshaled_response(text: str) -> Dict[str, str]:
+        """Split a multi-section reply into {section_id: content} on its ===SECTION=== delimiters"""
+        drafted = {}
+        matches = list(_MARSHALED_SECTION_RE.finditer(text or ''))
+        for match, next_match in zip(matches, matches[1:] + [None]):
+            end = next_match.start() if next_match else len(text)
+            drafted[match.group(1)] = text[match.end():end].strip()
+        return drafted
     
     def _build_subsection_prompt(self, section_def: Dict[str, Any], 
                                 subsection_def: Dict[str, Any],
                                 context: Dict[str, Any]) -> str:
         """Build LLM prompt for subsection drafting"""
-        prompt = f"""You are a technical documentation expert drafting a subsection for BMO Model Documentation.
-
-**Parent Section:** {section_def.get('title')}
-**Subsection to Draft:**
-Title: {subsection_def.get('title')}
-Description: {subsection_def.get('description')}
-
-**Context Information:**
-"""
+        prompt_parts = [_SUBSECTION_PREAMBLE.format_map({
+            'section_title': section_def.get('title'),
+            'title': subsection_def.get('title'),
+            'description': subsection_def.get('description')
+        })]
         
         if 'file_summaries' in context:
-            prompt += "\n**Relevant Code:**\n"
-            for file_path, summary in list(context['file_summaries'].items())[:3]:
-                prompt += f"{file_path}: {summary[:200]}...\n"
+            prompt_parts.append("\n**Relevant Code:**\n")
+            packed = _pack_summaries(context['file_summaries'],
+                                     self.config.get('subsection_summary_tokens', 1000),
+                                     path_sep=": ")
+            if packed:
+                prompt_parts.append(packed + "\n")
         
-        prompt += """
-
-**Instructions:**
-Draft this subsection in markdown format using ### heading level.
-
-Subsection content:
-"""
+        prompt_parts.append(_SUBSECTION_INSTRUCTIONS)
         
-        return prompt
+        return "".join(prompt_parts)
     
     def _llm_draft_section(self, prompt: str) -> str:
         """Call LLM to draft section"""
+        if self.prompt_cache:
+            cached = self._response_cache.get(self._prompt_key(prompt))
+            if cached is not None:
+                return cached
+        
         try:
             if self.llm_facade:
                 response = self.llm_facade.generate(
@@ -472,79 +1237,111 @@ Subsection content:
                     max_tokens=4096
                 )
 
+                # The facade answers with mock text when the provider fails;
+                # return it but do not cache it
+                used_fallback = getattr(self.llm_facade, 'used_fallback', None)
+                if used_fallback is not None and used_fallback() and isinstance(response, str):
+                    return response
+
                 # Accept string responses directly
                 if isinstance(response, str):
-                    return response
+                    return self._cache_response(prompt, response)
                 # Or dict-like responses
                 if response and isinstance(response, dict):
                     if 'text' in response:
-                        return response['text']
+                        return self._cache_response(prompt, response['text'])
                     if 'content' in response:
-                        return response['content']
+                        return self._cache_response(prompt, response['content'])
             
             # Fallback to direct API call
             api_key = os.environ.get('ANTHROPIC_API_KEY')
             if api_key:
-                from anthropic import Anthropic
-                client = Anthropic(api_key=api_key)
-                
-                message = client.messages.create(
-                    model='claude-sonnet-4-20250514',
+                message = self._get_anthropic_client().messages.create(
+                    model=ANTHROPIC_MODEL,
                     max_tokens=4096,
                     temperature=0.3,
                     messages=[{"role": "user", "content": prompt}]
                 )
                 
-                return message.content[0].text
+                return self._cache_response(prompt, message.content[0].text)
         
         except Exception as e:
-            print(f"[WARNING] LLM call failed: {e}, using mock")
+            logger.warning(f"LLM call failed: {e}, using mock")
         
         # Fallback to mock
         return "[LLM API failed, using mock content]"
     
+    def _can_stream(self) -> bool:
+        """Whether sections are drafted through the direct Anthropic API, which can stream"""
+        return self.llm_facade is None and Anthropic is not None and bool(os.environ.get('ANTHROPIC_API_KEY'))
+    
+    def _llm_draft_section_streaming(self, prompt: str, out_path: str) -> str:
+        """
+        Draft a section with the streaming API, writing text to out_path as it arrives
+        
+        If streaming fails, the section is drafted with _llm_draft_section and
+        its result written to out_path instead.
+        
+        Args:
+            prompt: Section prompt
+            out_path: Debug output file
+            
+        Returns:
+            Drafted content
+        """
+        content = self._response_cache.get(self._prompt_key(prompt)) if self.prompt_cache else None
+        if content is None:
+            chunks = []
+            try:
+                os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+                with open(out_path, 'w', encoding='utf-8') as f:
+                    with self._get_anthropic_client().messages.stream(
+                        model=ANTHROPIC_MODEL,
+                        max_tokens=4096,
+                        temperature=0.3,
+                        messages=[{"role": "user", "content": prompt}]
+                    ) as stream:
+                        for text in stream.text_stream:
+                            f.write(text)
+                            chunks.append(text)
+                return self._cache_response(prompt, ''.join(chunks))
+            except Exception as e:
+                logger.warning(f"Streaming LLM call failed: {e}, retrying without streaming")
+            content = self._llm_draft_section(prompt)
+        
+        try:
+            with open(out_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        except Exception:
+            pass
+        return content
+    
     def _mock_draft_section(self, section_def: Dict[str, Any], 
                            context: Dict[str, Any]) -> str:
         """Generate mock section content"""
-        title = section_def.get('title', 'Section')
-        description = section_def.get('description', '')
-        
-        content = f"## {title}\n\n"
-        content += f"{description}\n\n"
+        parts = [_MOCK_SECTION_TMPL.format_map({
+            'title': section_def.get('title', 'Section'),
+            'description': section_def.get('description', '')
+        })]
         
         # Add subsections if present
         if 'subsections' in section_def:
-            for subsection in section_def['subsections']:
-                content += f"### {subsection.get('title')}\n\n"
-                content += f"{subsection.get('description')}\n\n"
-                content += "**Key Points:**\n"
-                content += "- Point 1: Analysis and discussion\n"
-                content += "- Point 2: Technical details\n"
-                content += "- Point 3: Conclusions and observations\n\n"
+            parts.extend(_MOCK_SECTION_SUBSECTION_TMPL.format_map({
+                'title': subsection.get('title'),
+                'description': subsection.get('description')
+            }) for subsection in section_def['subsections'])
         else:
-            content += "**Overview:**\n\n"
-            content += "This section provides comprehensive coverage of the topic.\n\n"
-            content += "**Key Points:**\n"
-            content += "- Point 1: Based on codebase analysis\n"
-            content += "- Point 2: Technical implementation details\n"
-            content += "- Point 3: Observations and recommendations\n\n"
+            parts.append(_MOCK_SECTION_OVERVIEW)
         
-        return content
+        return "".join(parts)
     
     def _mock_draft_subsection(self, subsection_def: Dict[str, Any], 
                               context: Dict[str, Any]) -> str:
         """Generate mock subsection content"""
-        title = subsection_def.get('title', 'Subsection')
-        description = subsection_def.get('description', '')
-        
-        content = f"### {title}\n\n"
-        content += f"{description}\n\n"
-        content += "**Details:**\n"
-        content += "- Key aspect 1\n"
-        content += "- Key aspect 2\n"
-        content += "- Key aspect 3\n\n"
-        
-        return content
+        return _MOCK_SUBSECTION_TMPL.format_map({
+            'title': subsection_def.get('title', 'Subsection'),
+            'description': subsection_def.get('description', '')
+        })
     
     def get_schema(self) -> Dict[str, Any]:
         """Return tool schema"""
@@ -571,6 +1368,16 @@ Subsection content:
                         'use_mock': 'Whether to use mock LLM (optional)'
                     }
                 },
+                {
+                    'name': 'draft_subsections',
+                    'description': 'Draft several subsections of a section concurrently',
+                    'parameters': {
+                        'section_id': 'Parent section ID',
+                        'subsection_ids': 'Subsection IDs (optional, defaults to all)',
+                        'context': 'Context data',
+                        'use_mock': 'Whether to use mock LLM (optional)'
+                    }
+                },
                 {
                     'name': 'draft_from_template',
                     'description': 'Draft multiple sections from template',
@@ -6,16 +6,59 @@ Handles BMO documentation templates
 """
 import json
 import os
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, ClassVar
+from core import json_utils
 from tools.base_tool import BaseTool
 
 
+# Actions offered by the template manager; get_schema returns copies
+_SCHEMA_ACTIONS = (
+    {
+        'name': 'load_template',
+        'description': 'Load BMO template from JSON file',
+        'parameters': {
+            'template_path': 'Path to template JSON file'
+        }
+    },
+    {
+        'name': 'validate_structure',
+        'description': 'Validate data against template structure',
+        'parameters': {
+            'data': 'Data to validate',
+            'template': 'Template to validate against'
+        }
+    },
+    {
+        'name': 'extract_section_schema',
+        'description': 'Extract schema for specific section',
+        'parameters': {
+            'template': 'Template dictionary',
+            'section_id': 'ID of section to extract'
+        }
+    }
+)
+
+
 class TemplateManagerTool(BaseTool):
     """Tool for managing documentation templates"""
     
+    # Number of recently loaded templates whose canonical lookups are kept
+    _CANONICAL_CACHE_SIZE: ClassVar[int] = 16
+    
+    # Action name -> handler method
+    _ACTIONS: ClassVar[Dict[str, str]] = {
+        'load_template': '_load_template',
+        'validate_structure': '_validate_structure',
+        'extract_section_schema': '_extract_section_schema',
+    }
+    
     def __init__(self, tool_name: str, description: str, config: Dict[str, Any] = None):
         super().__init__(tool_name, description, config)
         self.templates_dir = config.get('templates_dir', 'data/templates')
+        # id(template) -> (template, canonical lookups) for templates returned by _load_template;
+        # kept beside the template so its data stays plain JSON
+        self._canonical_cache: "OrderedDict[int, Tuple[Dict[str, Any], Dict[str, Any]]]" = OrderedDict()
     
     def execute(self, action: str, **kwargs) -> Dict[str, Any]:
         """
@@ -29,17 +72,13 @@ class TemplateManagerTool(BaseTool):
             Dictionary with success status and result/error
         """
         try:
-            if action == "load_template":
-                return self._load_template(**kwargs)
-            elif action == "validate_structure":
-                return self._validate_structure(**kwargs)
-            elif action == "extract_section_schema":
-                return self._extract_section_schema(**kwargs)
-            else:
+            method_name = self._ACTIONS.get(action)
+            if method_name is None:
                 return {
                     'success': False,
                     'error': f'Unknown action: {action}'
                 }
+            return getattr(self, method_name)(**kwargs)
         except Exception as e:
             return {
                 'success': False,
@@ -63,8 +102,11 @@ class TemplateManagerTool(BaseTool):
             }
         
         try:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                template = json.load(f)
+            with open(template_path, 'rb') as f:
+                template = json_utils.loads(f.read())
+            
+            # Walk sections once so validation and schema lookups reuse the result
+            self._remember_canonical(template)
             
             # Extract template metadata
             metadata = {
@@ -108,41 +150,38 @@ class TemplateManagerTool(BaseTool):
             warnings = []
             
             # Check required template sections
-            template_sections = template.get('sections', [])
             data_sections = data.get('sections', {})
             
-            # Build section ID map from template
-            template_section_ids = set()
-            for section in template_sections:
-                template_section_ids.add(section.get('id'))
-                
-                # Check for subsections
-                if 'subsections' in section:
-                    for subsection in section['subsections']:
-                        subsection_id = subsection.get('id')
-                        template_section_ids.add(subsection_id)
+            canonical = self._canonical(template)
+            
+            # Section and subsection IDs from template
+            template_section_ids = canonical['section_ids']
+            data_section_ids = data_sections.keys()
             
             # Check if all template sections are present in data
-            missing_sections = template_section_ids - set(data_sections.keys())
+            missing_sections = template_section_ids - data_section_ids
             if missing_sections:
                 warnings.append(f"Missing sections in data: {', '.join(missing_sections)}")
             
             # Check for extra sections in data
-            extra_sections = set(data_sections.keys()) - template_section_ids
+            extra_sections = data_section_ids - template_section_ids
             if extra_sections:
                 warnings.append(f"Extra sections in data: {', '.join(extra_sections)}")
             
             # Validate metadata fields
             if 'metadata_fields' in template:
-                template_metadata_ids = {field['id'] for field in template['metadata_fields']}
+                template_metadata_ids = canonical['metadata_ids']
+                if template_metadata_ids is None:
+                    template_metadata_ids = {field['id'] for field in template['metadata_fields']}
                 data_metadata = data.get('metadata_values', {})
                 
-                missing_metadata = template_metadata_ids - set(data_metadata.keys())
+                missing_metadata = template_metadata_ids.difference(data_metadata)
                 if missing_metadata:
                     warnings.append(f"Missing metadata fields: {', '.join(missing_metadata)}")
             
             # Validate section content
             for section_id, section_data in data_sections.items():
+                # Exact-type check first; dict subclasses still pass via isinstance
                 if not isinstance(section_data, dict):
                     errors.append(f"Section {section_id} is not a dictionary")
                     continue
@@ -179,25 +218,17 @@ class TemplateManagerTool(BaseTool):
             Dictionary with section schema
         """
         try:
-            # Search for section in template
-            for section in template.get('sections', []):
-                if section.get('id') == section_id:
-                    return {
-                        'success': True,
-                        'section_schema': section,
-                        'section_id': section_id
-                    }
-                
-                # Check subsections
-                if 'subsections' in section:
-                    for subsection in section['subsections']:
-                        if subsection.get('id') == section_id:
-                            return {
-                                'success': True,
-                                'section_schema': subsection,
-                                'section_id': section_id,
-                                'parent_section': section.get('id')
-                            }
+            entry = self._canonical(template)['section_index'].get(section_id)
+            if entry is not None:
+                section_schema, parent = entry
+                result = {
+                    'success': True,
+                    'section_schema': section_schema,
+                    'section_id': section_id
+                }
+                if parent is not None:
+                    result['parent_section'] = parent.get('id')
+                return result
             
             return {
                 'success': False,
@@ -210,35 +241,73 @@ class TemplateManagerTool(BaseTool):
                 'error': f'Schema extraction error: {str(e)}'
             }
     
+    @staticmethod
+    def _build_section_index(template: Dict[str, Any]) -> Dict[Optional[str], Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """
+        Map every section and subsection ID to its schema and parent section
+        
+        Args:
+            template: Template dictionary
+            
+        Returns:
+            Dictionary of ID -> (schema, parent section or None); the first
+            occurrence of a duplicated ID wins
+        """
+        index = {}
+        for section in template.get('sections', []):
+            index.setdefault(section.get('id'), (section, None))
+            
+            if 'subsections' in section:
+                for subsection in section['subsections']:
+                    index.setdefault(subsection.get('id'), (subsection, section))
+        return index
+    
+    @classmethod
+    def _canonicalize(cls, template: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Precompute the lookups validation and schema extraction need
+        
+        Args:
+            template: Template dictionary
+            
+        Returns:
+            Dictionary with 'section_index', 'section_ids' (frozenset of section
+            and subsection IDs) and 'metadata_ids' (frozenset, or None when the
+            template's metadata fields are missing or malformed)
+        """
+        section_index = cls._build_section_index(template)
+        try:
+            metadata_ids = frozenset(field['id'] for field in template['metadata_fields'])
+        except (KeyError, TypeError):
+            metadata_ids = None
+        return {
+            'section_index': section_index,
+            'section_ids': frozenset(section_index),
+            'metadata_ids': metadata_ids
+        }
+    
+    def _remember_canonical(self, template: Dict[str, Any]) -> None:
+        """Cache the canonical lookups of a freshly loaded template"""
+        cache = self._canonical_cache
+        while len(cache) >= self._CANONICAL_CACHE_SIZE:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                break
+        cache[id(template)] = (template, self._canonicalize(template))
+    
+    def _canonical(self, template: Dict[str, Any]) -> Dict[str, Any]:
+        """Lookups cached by _load_template, or fresh ones for other templates"""
+        entry = self._canonical_cache.get(id(template))
+        if entry is not None and entry[0] is template:
+            return entry[1]
+        return self._canonicalize(template)
+    
     def get_schema(self) -> Dict[str, Any]:
         """Return tool schema"""
         return {
             'name': self.tool_name,
             'description': self.description,
-            'actions': [
-                {
-                    'name': 'load_template',
-                    'description': 'Load BMO template from JSON file',
-                    'parameters': {
-                        'template_path': 'Path to template JSON file'
-                    }
-                },
-                {
-                    'name': 'validate_structure',
-                    'description': 'Validate data against template structure',
-                    'parameters': {
-                        'data': 'Data to validate',
-                        'template': 'Template to validate against'
-                    }
-                },
-                {
-                    'name': 'extract_section_schema',
-                    'description': 'Extract schema for specific section',
-                    'parameters': {
-                        'template': 'Template dictionary',
-                        'section_id': 'ID of section to extract'
-                    }
-                }
-            ]
+            'actions': [{**action, 'parameters': dict(action['parameters'])} for action in _SCHEMA_ACTIONS]
         }
 
@@ -5,17 +5,54 @@ Foundation for all tools in the system including MCP tools
 © 2025-2030 Ashutosh Sinha, ajsinha@gmail.com, https://www.github.com/ajsinha/abhikarta
 """
 
-import json
 import os
+import time
+import logging
+import functools
 import importlib
 import requests
-from typing import Dict, Any, List, Optional
-from threading import Lock
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, List, Optional, Tuple, Callable, Iterator
+from threading import Lock, Thread, Event
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from core import json_utils
 from tools.base_tool import BaseTool
 from tools.mcp_tool import MCPTool
 
+logger = logging.getLogger(__name__)
+
+# (epoch second, its local ISO-8601 text) for the last timestamp formatted
+_iso_second = (None, '')
+
+
+def _isoformat_now() -> str:
+    """datetime.now().isoformat(), formatting the date and time part at most once per second"""
+    global _iso_second
+    second, nanos = divmod(time.time_ns(), 1_000_000_000)
+    cached = _iso_second
+    if cached[0] != second:
+        cached = (second, datetime.fromtimestamp(second).isoformat())
+        _iso_second = cached
+    micros = nanos // 1000
+    return f"{cached[1]}.{micros:06d}" if micros else cached[1]
+
+
+def _json_config_entries(directory: str) -> List[os.DirEntry]:
+    """JSON files in a config directory"""
+    with os.scandir(directory) as it:
+        return [entry for entry in it if entry.name.endswith('.json') and entry.is_file()]
+
+
+def _instantiate_tool(module_path: str, tool_name: str, description: str,
+                      config: Dict[str, Any]) -> BaseTool:
+    """Import a tool class from its dotted module path and instantiate it"""
+    module_name, class_name = module_path.rsplit('.', 1)
+    module = importlib.import_module(module_name)
+    tool_class = getattr(module, class_name)
+    return tool_class(tool_name=tool_name, description=description, config=config)
+
 
 class ToolRegistry:
     """Singleton registry for tool management"""
@@ -23,29 +60,54 @@ class ToolRegistry:
     _instance = None
     _lock = Lock()
     
+    # Seconds a get_mcp_servers_status snapshot is served before servers are probed again
+    MCP_STATUS_TTL = 5.0
+    
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
-                    cls._instance = super(ToolRegistry, cls).__new__(cls)
-                    cls._instance._initialized = False
+                    # Fully set up before publishing, so later calls never lock or re-check
+                    instance = super(ToolRegistry, cls).__new__(cls)
+                    instance._setup()
+                    cls._instance = instance
         return cls._instance
     
-    def __init__(self):
-        if self._initialized:
-            return
-        
+    def _setup(self) -> None:
+        """One-time initialization of the singleton"""
+        # Tools are built on first use; _tools holds the instantiated ones
+        self._tool_factories: Dict[str, Callable[[], BaseTool]] = {}
         self._tools: Dict[str, BaseTool] = {}
+        self._tools_lock = Lock()
         self._tool_configs: Dict[str, Dict[str, Any]] = {}
+        # get_tools_for_planner result, rebuilt after the tool set changes
+        self._planner_schema_cache: Optional[List[Dict[str, Any]]] = None
         self._config_dir = 'config/tools'
         self._mcp_config_dir = 'config/mcp'
-        self._initialized = True
+        # Parsed config files by path, stored as ((mtime_ns, size), config)
+        self._config_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+        # Keep-alive session shared by MCP health probes and MCP tools
+        self._http_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0)
+        self._http_session.mount('http://', adapter)
+        self._http_session.mount('https://', adapter)
+        self._http_session.headers['Accept-Encoding'] = 'gzip, deflate'
+        # Last MCP health snapshot and its time.monotonic() stamp (0.0 = never probed)
+        self._mcp_status_cache: List[Dict[str, Any]] = []
+        self._mcp_status_ts = 0.0
+        self._mcp_status_lock = Lock()
+        # Set while a background status poller is running
+        self._mcp_status_stop: Optional[Event] = None
         self.load_tools()
     
     def load_tools(self) -> None:
         """Load tools from configuration directories"""
+        self._tool_factories.clear()
         self._tools.clear()
         self._tool_configs.clear()
+        self._planner_schema_cache = None
+        # MCP configs may have changed; probe again on the next status read
+        self._mcp_status_ts = 0.0
         
         # Load regular tools
         if os.path.exists(self._config_dir):
@@ -57,85 +119,171 @@ class ToolRegistry:
     
     def _load_regular_tools(self) -> None:
         """Load regular (non-MCP) tools"""
-        for filename in os.listdir(self._config_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self._config_dir, filename)
-                try:
-                    with open(filepath, 'r') as f:
-                        config = json.load(f)
-                    
-                    # Check if tool is enabled
-                    if not config.get('enabled', True):
-                        continue  # Skip disabled tools
-
-                    tool_name = config.get('name')
-                    module_path = config.get('module')
-
-                    if tool_name and module_path:
-                        self._tool_configs[tool_name] = config
-
-                        # Dynamically load tool class
-                        try:
-                            module_name, class_name = module_path.rsplit('.', 1)
-                            module = importlib.import_module(module_name)
-                            tool_class = getattr(module, class_name)
-
-                            # Instantiate tool
-                            tool = tool_class(
-                                tool_name=tool_name,
-                                description=config.get('description', ''),
-                                config=config.get('config', {})
-                            )
-
-                            self._tools[tool_name] = tool
-                        except Exception as e:
-                            print(f"Error loading tool {tool_name}: {e}")
-
-                except Exception as e:
-                    print(f"Error reading tool config {filename}: {e}")
+        entries = _json_config_entries(self._config_dir)
+        self._prefetch_configs(entries)
+        for entry in entries:
+            try:
+                config = self._read_json_cached(entry.path, entry.stat())
+                
+                # Check if tool is enabled
+                if not config.get('enabled', True):
+                    continue  # Skip disabled tools
+
+                self._register_tool(config)
+
+            except Exception as e:
+                logger.warning("Error reading tool config %s: %s", entry.name, e)
+
+    def _register_tool(self, config: Dict[str, Any]) -> None:
+        """Register a regular tool from its config, replacing any loaded instance"""
+        tool_name = config.get('name')
+        module_path = config.get('module')
+
+        if tool_name and module_path:
+            self._tool_configs[tool_name] = config
+
+            # Tool class is imported and instantiated on first use
+            self._tool_factories[tool_name] = functools.partial(
+                _instantiate_tool,
+                module_path,
+                tool_name,
+                config.get('description', ''),
+                config.get('config', {})
+            )
+            self._tools.pop(tool_name, None)
+            self._planner_schema_cache = None
 
     def _load_mcp_tools(self) -> None:
         """Load MCP tools"""
-        for filename in os.listdir(self._mcp_config_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self._mcp_config_dir, filename)
-                try:
-                    with open(filepath, 'r') as f:
-                        config = json.load(f)
+        entries = _json_config_entries(self._mcp_config_dir)
+        self._prefetch_configs(entries)
+        for entry in entries:
+            try:
+                config = self._read_json_cached(entry.path, entry.stat())
+
+                mcp_name = config.get('name')
+                mcp_url = config.get('mcp_url', 'http://localhost:8000')
+                tool_description = config.get('tool_description', {})
+
+                # Create MCP tools from the tool descriptions
+                for tool_config in tool_description.get('tools', []):
+                    tool_name = f"{mcp_name}_{tool_config['name']}"
+
+                    self._tool_factories[tool_name] = functools.partial(
+                        MCPTool,
+                        tool_name=tool_name,
+                        description=tool_config.get('description', ''),
+                        mcp_url=mcp_url,
+                        tool_config=tool_config,
+                        config=config,
+                        session=self._http_session
+                    )
+                    self._tool_configs[tool_name] = tool_config
+
+            except Exception as e:
+                logger.warning("Error reading MCP config %s: %s", entry.name, e)
+
+    def _prefetch_configs(self, entries: List[os.DirEntry]) -> None:
+        """
+        Read changed config files concurrently and parse them into the cache
 
-                    mcp_name = config.get('name')
-                    mcp_url = config.get('mcp_url', 'http://localhost:8000')
-                    tool_description = config.get('tool_description', {})
+        Files that cannot be read or parsed are left out, so the per-file read
+        that follows reports the error.
 
-                    # Create MCP tools from the tool descriptions
-                    for tool_config in tool_description.get('tools', []):
-                        tool_name = f"{mcp_name}_{tool_config['name']}"
+        Args:
+            entries: Config files about to be read
+        """
+        stale = []
+        for entry in entries:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            stamp = (st.st_mtime_ns, st.st_size)
+            cached = self._config_cache.get(entry.path)
+            if cached is None or cached[0] != stamp:
+                stale.append((entry.path, stamp))
+        if len(stale) < 2:
+            return
+
+        contents = json_utils.read_files([path for path, _ in stale])
+        for (path, stamp), data in zip(stale, contents):
+            if isinstance(data, bytes):
+                try:
+                    self._config_cache[path] = (stamp, json_utils.loads(data))
+                except ValueError:
+                    pass
 
-                        tool = MCPTool(
-                            tool_name=tool_name,
-                            description=tool_config.get('description', ''),
-                            mcp_url=mcp_url,
-                            tool_config=tool_config,
-                            config=config
-                        )
+    def _read_json_cached(self, path: str, st: os.stat_result = None) -> Dict[str, Any]:
+        """
+        Read a JSON config file, reparsing it only when it changed on disk
 
-                        self._tools[tool_name] = tool
-                        self._tool_configs[tool_name] = tool_config
+        Args:
+            path: Config file path
+            st: The file's stat result, if the caller already has it
 
-                except Exception as e:
-                    print(f"Error reading MCP config {filename}: {e}")
+        Returns:
+            Parsed config (shared with the cache; copy before mutating)
+        """
+        if st is None:
+            st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._config_cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        with open(path, 'rb') as f:
+            config = json_utils.loads(f.read())
+        self._config_cache[path] = (stamp, config)
+        return config
+
+    def _write_json(self, path: str, config: Dict[str, Any]) -> None:
+        """Atomically write a config file and keep the cache in step with it"""
+        json_utils.write_atomic(path, config, indent=True)
+        st = os.stat(path)
+        self._config_cache[path] = ((st.st_mtime_ns, st.st_size), config)
 
     def get_tool(self, tool_name: str) -> Optional[BaseTool]:
-        """Get tool by name"""
-        return self._tools.get(tool_name)
+        """Get tool by name, instantiating it on first use"""
+        tool = self._tools.get(tool_name)
+        if tool is not None:
+            return tool
+
+        with self._tools_lock:
+            tool = self._tools.get(tool_name)
+            if tool is None:
+                factory = self._tool_factories.get(tool_name)
+                if factory is None:
+                    return None
+                try:
+                    tool = factory()
+                except Exception as e:
+                    # Tools that fail to load are dropped, as if never registered
+                    logger.warning("Error loading tool %s: %s", tool_name, e)
+                    del self._tool_factories[tool_name]
+                    return None
+                self._tools[tool_name] = tool
+        return tool
 
     def get_all_tools(self) -> List[BaseTool]:
         """Get all registered tools"""
-        return list(self._tools.values())
+        return list(self.iter_tools())
+
+    def iter_tools(self) -> Iterator[BaseTool]:
+        """
+        Yield each registered tool, instantiating it on demand
+        
+        Iterates over a snapshot of the registered names, so tools can be
+        registered or reloaded while a caller is iterating.
+        """
+        for tool_name in list(self._tool_factories):
+            tool = self.get_tool(tool_name)
+            if tool is not None:
+                yield tool
 
     def execute_tool(self, tool_name: str, **kwargs) -> Dict[str, Any]:
         """Execute a tool"""
-        tool = self._tools.get(tool_name)
+        tool = self.get_tool(tool_name)
         if not tool:
             return {
                 'success': False,
@@ -148,14 +296,14 @@ class ToolRegistry:
                 'success': True,
                 'result': result,
                 'tool_name': tool_name,
-                'executed_at': datetime.now().isoformat()
+                'executed_at': _isoformat_now()
             }
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e),
                 'tool_name': tool_name,
-                'executed_at': datetime.now().isoformat()
+                'executed_at': _isoformat_now()
             }
 
     def reload(self) -> None:
@@ -164,7 +312,7 @@ class ToolRegistry:
 
     def get_tool_info(self, tool_name: str) -> Optional[Dict[str, Any]]:
         """Get tool information"""
-        tool = self._tools.get(tool_name)
+        tool = self.get_tool(tool_name)
         if tool:
             return tool.to_dict()
         return None
@@ -172,67 +320,157 @@ class ToolRegistry:
     def list_tools(self) -> List[Dict[str, Any]]:
         """List all tools with their info"""
         tools_list = []
-        for tool in self._tools.values():
+        for tool in self.iter_tools():
             tool_dict = tool.to_dict()
             tool_dict['enabled'] = self.is_tool_enabled(tool.tool_name)
             tools_list.append(tool_dict)
         return tools_list
 
     def get_tools_for_planner(self) -> List[Dict[str, Any]]:
-        """Get tool schemas for planner"""
-        return [tool.get_schema() for tool in self._tools.values()]
+        """Get tool schemas for planner (a cached list; do not modify)"""
+        if self._planner_schema_cache is not None:
+            return self._planner_schema_cache
+
+        schemas = []
+        for tool_name in list(self._tool_factories):
+            # A schema in the tool's config spares instantiating the tool
+            schema = self._tool_configs.get(tool_name, {}).get('schema')
+            if schema is None:
+                tool = self.get_tool(tool_name)
+                if tool is None:
+                    continue
+                schema = tool.get_schema()
+            schemas.append(schema)
+        self._planner_schema_cache = schemas
+        return schemas
 
     def get_mcp_servers_status(self) -> List[Dict[str, Any]]:
-        """Get status of all configured MCP servers"""
-        import time
+        """
+        Get status of all configured MCP servers
+
+        Without a poller the snapshot is at most MCP_STATUS_TTL seconds old;
+        with one (start_mcp_status_poller) the poller's latest snapshot is
+        returned as-is, and only the very first read waits for a probe.
+        """
+        if self._mcp_status_stop is None or not self._mcp_status_ts:
+            self._refresh_mcp_status()
+        return [dict(server) for server in self._mcp_status_cache]
+
+    def _refresh_mcp_status(self, force: bool = False) -> None:
+        """
+        Re-probe MCP servers when the cached snapshot has expired
+
+        Args:
+            force: Probe even if the snapshot is still fresh
+        """
+        if not force and time.monotonic() - self._mcp_status_ts < self.MCP_STATUS_TTL:
+            return
+        with self._mcp_status_lock:
+            # Another caller may have refreshed while we waited
+            if not force and time.monotonic() - self._mcp_status_ts < self.MCP_STATUS_TTL:
+                return
+            self._mcp_status_cache = self._probe_mcp_servers()
+            self._mcp_status_ts = time.monotonic()
+
+    def start_mcp_status_poller(self, interval: float = 10.0) -> None:
+        """
+        Refresh MCP server status in a daemon thread so status reads never wait on probes
+
+        Meant for long-running processes that show server status repeatedly
+        (e.g. a web dashboard): call it once at startup. Short-lived scripts
+        can rely on the TTL cache instead.
+
+        Args:
+            interval: Seconds between refreshes
+        """
+        if self._mcp_status_stop is not None:
+            return
+        stop = Event()
+        self._mcp_status_stop = stop
+
+        def poll():
+            while not stop.is_set():
+                try:
+                    self._refresh_mcp_status(force=True)
+                except Exception as e:
+                    logger.warning("MCP status refresh failed: %s", e)
+                stop.wait(interval)
+
+        Thread(target=poll, name='mcp-status-poller', daemon=True).start()
+
+    def stop_mcp_status_poller(self) -> None:
+        """Stop the background MCP status poller, if one is running"""
+        if self._mcp_status_stop is not None:
+            self._mcp_status_stop.set()
+            self._mcp_status_stop = None
+
+    def _probe_mcp_servers(self) -> List[Dict[str, Any]]:
+        """Read the MCP server configs and check each server's health"""
         mcp_servers = []
 
         if not os.path.exists(self._mcp_config_dir):
             return mcp_servers
 
-        for filename in os.listdir(self._mcp_config_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self._mcp_config_dir, filename)
-                try:
-                    with open(filepath, 'r') as f:
-                        config = json.load(f)
-
-                    mcp_name = config.get('name', filename.replace('.json', ''))
-                    mcp_url = config.get('mcp_url', 'http://localhost:8000')
-                    tool_description = config.get('tool_description', {})
-                    tool_count = len(tool_description.get('tools', []))
-
-                    # Check server health
-                    status = 'offline'
-                    response_time = None
-
-                    try:
-                        start_time = time.time()
-                        response = requests.get(
-                            f"{mcp_url}/health",
-                            timeout=2
-                        )
-                        response_time = int((time.time() - start_time) * 1000)
-
-                        if response.status_code == 200:
-                            status = 'online'
-                    except:
-                        status = 'offline'
-
-                    mcp_servers.append({
-                        'name': mcp_name,
-                        'url': mcp_url,
-                        'status': status,
-                        'response_time': response_time,
-                        'tool_count': tool_count,
-                        'config_file': filename
-                    })
+        entries = _json_config_entries(self._mcp_config_dir)
+        self._prefetch_configs(entries)
+        for entry in entries:
+            try:
+                config = self._read_json_cached(entry.path, entry.stat())
+
+                mcp_name = config.get('name', entry.name.replace('.json', ''))
+                mcp_url = config.get('mcp_url', 'http://localhost:8000')
+                tool_description = config.get('tool_description', {})
+                tool_count = len(tool_description.get('tools', []))
+
+                mcp_servers.append({
+                    'name': mcp_name,
+                    'url': mcp_url,
+                    'status': 'offline',
+                    'response_time': None,
+                    'tool_count': tool_count,
+                    'config_file': entry.name
+                })
+
+            except Exception as e:
+                logger.warning("Error reading MCP config %s: %s", entry.name, e)
+
+        if not mcp_servers:
+            return mcp_servers
 
-                except Exception as e:
-                    print(f"Error reading MCP config {filename}: {e}")
+        # Check server health concurrently; wall time is one round trip, not one per server
+        with ThreadPoolExecutor(max_workers=min(32, len(mcp_servers))) as executor:
+            futures = {executor.submit(self._probe_mcp_server, self._http_session, server['url']): server
+                       for server in mcp_servers}
+            for future in as_completed(futures):
+                server = futures[future]
+                server['status'], server['response_time'] = future.result()
 
         return mcp_servers
 
+    @staticmethod
+    def _probe_mcp_server(session: requests.Session, mcp_url: str) -> Tuple[str, Optional[int]]:
+        """
+        Check one MCP server's health endpoint
+
+        Args:
+            session: HTTP session to send the request with
+            mcp_url: Base URL of the MCP server
+
+        Returns:
+            Tuple of (status, response time in ms or None if unreachable)
+        """
+        try:
+            start_time = time.time()
+            response = session.get(
+                f"{mcp_url}/health",
+                timeout=2
+            )
+            response_time = int((time.time() - start_time) * 1000)
+        except:
+            return 'offline', None
+
+        return ('online' if response.status_code == 200 else 'offline'), response_time
+
     def create_tool_from_json(self, tool_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new tool from JSON configuration
@@ -255,7 +493,7 @@ class ToolRegistry:
                 return {'success': False, 'error': 'Tool name is required'}
 
             # Check if tool already exists
-            if tool_name in self._tools:
+            if tool_name in self._tool_factories:
                 return {'success': False, 'error': f'Tool {tool_name} already exists'}
 
             # Ensure config directory exists
@@ -275,12 +513,9 @@ class ToolRegistry:
                 'enabled': True
             }
 
-            # Write configuration file
-            with open(config_path, 'w') as f:
-                json.dump(config, f, indent=2)
-
-            # Reload tools to include new one
-            self.load_tools()
+            # Write configuration file and register the new tool
+            self._write_json(config_path, config)
+            self._register_tool(config)
 
             return {
                 'success': True,
@@ -301,17 +536,14 @@ class ToolRegistry:
             if not os.path.exists(config_path):
                 return False
 
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-
+            config = dict(self._read_json_cached(config_path))
             config['enabled'] = True
 
-            with open(config_path, 'w') as f:
-                json.dump(config, f, indent=2)
-
-            self.load_tools()
+            self._write_json(config_path, config)
+            self._register_tool(config)
             return True
-        except:
+        except Exception as e:
+            logger.warning("Could not enable tool %s: %s", tool_name, e)
             return False
 
     def disable_tool(self, tool_name: str) -> bool:
@@ -321,32 +553,29 @@ class ToolRegistry:
             if not os.path.exists(config_path):
                 return False
 
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-
+            config = dict(self._read_json_cached(config_path))
             config['enabled'] = False
 
-            with open(config_path, 'w') as f:
-                json.dump(config, f, indent=2)
+            self._write_json(config_path, config)
 
             # Remove from active tools
-            if tool_name in self._tools:
-                del self._tools[tool_name]
+            self._tool_factories.pop(tool_name, None)
+            self._tools.pop(tool_name, None)
+            self._planner_schema_cache = None
 
             return True
-        except:
+        except Exception as e:
+            logger.warning("Could not disable tool %s: %s", tool_name, e)
             return False
 
     def is_tool_enabled(self, tool_name: str) -> bool:
         """Check if a tool is enabled"""
         try:
             config_path = os.path.join(self._config_dir, f"{tool_name}.json")
-            if not os.path.exists(config_path):
-                return False
-
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-
-            return config.get('enabled', True)
-        except:
+            return self._read_json_cached(config_path).get('enabled', True)
+        except FileNotFoundError:
+            # MCP tools and removed tools have no config file of their own
+            return False
+        except Exception as e:
+            logger.warning("Could not read config for tool %s: %s", tool_name, e)
             return False
\ No newline at end of file
@@ -5,12 +5,15 @@ Manages DAG definitions and templates
 © 2025-2030 Ashutosh Sinha, ajsinha@gmail.com, https://www.github.com/ajsinha/abhikarta
 """
 
-import json
 import os
-from typing import Dict, List, Optional
+import logging
+from typing import Dict, List, Optional, Tuple
 from threading import Lock
+from core import json_utils
 from graph.graph import Graph, Node, Edge
 
+logger = logging.getLogger(__name__)
+
 
 class DAGRegistry:
     """Singleton registry for DAG management"""
@@ -22,17 +25,18 @@ class DAGRegistry:
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
-                    cls._instance = super(DAGRegistry, cls).__new__(cls)
-                    cls._instance._initialized = False
+                    # Fully set up before publishing, so later calls never lock or re-check
+                    instance = super(DAGRegistry, cls).__new__(cls)
+                    instance._setup()
+                    cls._instance = instance
         return cls._instance
     
-    def __init__(self):
-        if self._initialized:
-            return
-        
+    def _setup(self) -> None:
+        """One-time initialization of the singleton"""
         self._dags: Dict[str, Dict] = {}
         self._config_dir = 'config/dags'
-        self._initialized = True
+        # Parsed DAG files by path, stored as ((mtime_ns, size), config)
+        self._config_cache: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
         self.load_dags()
     
     def load_dags(self) -> None:
@@ -43,19 +47,57 @@ class DAGRegistry:
         
         self._dags.clear()
         
-        for filename in os.listdir(self._config_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self._config_dir, filename)
-                try:
-                    with open(filepath, 'r') as f:
-                        dag_config = json.load(f)
-                    
-                    dag_id = dag_config.get('dag_id')
-                    if dag_id:
-                        self._dags[dag_id] = dag_config
+        with os.scandir(self._config_dir) as it:
+            entries = [entry for entry in it if entry.name.endswith('.json') and entry.is_file()]
+        
+        self._prefetch_configs(entries)
+        for entry in entries:
+            try:
+                dag_config = self._read_json_cached(entry.path, entry.stat())
+                
+                dag_id = dag_config.get('dag_id')
+                if dag_id:
+                    self._dags[dag_id] = dag_config
                 
-                except Exception as e:
-                    print(f"Error reading DAG config {filename}: {e}")
+            except Exception as e:
+                logger.warning("Error reading DAG config %s: %s", entry.name, e)
+    
+    def _prefetch_configs(self, entries: List[os.DirEntry]) -> None:
+        """Read changed DAG files concurrently and parse them into the cache (failures are left to the per-file read)"""
+        stale = []
+        for entry in entries:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            stamp = (st.st_mtime_ns, st.st_size)
+            cached = self._config_cache.get(entry.path)
+            if cached is None or cached[0] != stamp:
+                stale.append((entry.path, stamp))
+        if len(stale) < 2:
+            return
+        
+        contents = json_utils.read_files([path for path, _ in stale])
+        for (path, stamp), data in zip(stale, contents):
+            if isinstance(data, bytes):
+                try:
+                    self._config_cache[path] = (stamp, json_utils.loads(data))
+                except ValueError:
+                    pass
+    
+    def _read_json_cached(self, path: str, st: os.stat_result = None) -> Dict:
+        """Read a DAG file, reparsing it only when it changed on disk"""
+        if st is None:
+            st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._config_cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
+        with open(path, 'rb') as f:
+            dag_config = json_utils.loads(f.read())
+        self._config_cache[path] = (stamp, dag_config)
+        return dag_config
     
     def get_dag_config(self, dag_id: str) -> Optional[Dict]:
         """Get DAG configuration"""
@@ -77,22 +119,21 @@ class DAGRegistry:
             description=dag_config.get('description', '')
         )
         
-        # Add nodes
-        for node_config in dag_config.get('nodes', []):
-            node = Node(
-                node_id=node_config['node_id'],
+        # Add nodes, collecting dependency edges in the same pass
+        pending_edges = []
+        for node_config in dag_config.get('nodes', ()):
+            node_id = node_config['node_id']
+            graph.add_node(Node(
+                node_id=node_id,
                 node_type=node_config.get('node_type', 'agent'),
                 agent_id=node_config.get('agent_id'),
                 config=node_config.get('config', {})
-            )
-            graph.add_node(node)
+            ))
+            pending_edges.extend((dep, node_id) for dep in node_config.get('dependencies', ()))
         
-        # Add edges based on dependencies
-        for node_config in dag_config.get('nodes', []):
-            node_id = node_config['node_id']
-            for dep in node_config.get('dependencies', []):
-                edge = Edge(from_node=dep, to_node=node_id)
-                graph.add_edge(edge)
+        # Add edges once every node exists, so both ends get linked
+        for from_node, to_node in pending_edges:
+            graph.add_edge(Edge(from_node=from_node, to_node=to_node))
         
         # Set start nodes
         graph.start_nodes = dag_config.get('start_nodes', [])
@@ -126,8 +167,8 @@ class DAGRegistry:
         # Save to file
         filepath = os.path.join(self._config_dir, f"{dag_id}.json")
         os.makedirs(self._config_dir, exist_ok=True)
-        with open(filepath, 'w') as f:
-            json.dump(dag_config, f, indent=2)
+        json_utils.write_atomic(filepath, dag_config, indent=True)
+        self._config_cache.pop(filepath, None)
         
         return True
     
@@ -140,8 +181,8 @@ class DAGRegistry:
         
         # Update file
         filepath = os.path.join(self._config_dir, f"{dag_id}.json")
-        with open(filepath, 'w') as f:
-            json.dump(dag_config, f, indent=2)
+        json_utils.write_atomic(filepath, dag_config, indent=True)
+        self._config_cache.pop(filepath, None)
         
         return True
     
@@ -156,5 +197,6 @@ class DAGRegistry:
         filepath = os.path.join(self._config_dir, f"{dag_id}.json")
         if os.path.exists(filepath):
             os.remove(filepath)
+        self._config_cache.pop(filepath, None)
         
         return True
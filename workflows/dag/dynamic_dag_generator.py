@@ -7,20 +7,138 @@ Generates documentation DAGs dynamically from templates
 
 import json
 import os
-from typing import Dict, Any, List
+import functools
+from typing import Dict, Any, List, Optional, Tuple, Iterable, Iterator
 import re
 
+# Imported directly (not via core.json_utils) so the CLI below runs as a plain script
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Section titles numbered like "1. Introduction"
+_H1_NUM_RE = re.compile(r'^\d+\.')
+
+# Section IDs always treated as top-level
+_SPECIAL_IDS = frozenset({'executive_summary', 'conclusion', 'introduction'})
+
+# Implementation-heavy section IDs whose drafting nodes also get the file summaries
+_IMPL_SECTIONS = frozenset({'implementation', 'methodology', 'data'})
+
+# Fixed preprocessing nodes (scan, parse, summarize), kept serialized so every
+# DAG gets its own copy from a single parse
+_PREPROCESSING_NODES_JSON = json.dumps([
+    {
+        "node_id": "scan_codebase",
+        "node_type": "tool",
+        "config": {
+            "tool_name": "filesystem_tool",
+            "input": {
+                "action": "list_directory",
+                "path": "{codebase_path}",
+                "extensions": [".py", ".js", ".ts", ".java", ".go", ".md", ".json"],
+                "recursive": True
+            }
+        },
+        "dependencies": []
+    },
+    {
+        "node_id": "parse_all_files",
+        "node_type": "tool",
+        "config": {
+            "tool_name": "code_parser_tool",
+            "input": {
+                "action": "analyze_structure",
+                "files": "{scan_codebase.result.files}"
+            }
+        },
+        "dependencies": ["scan_codebase"]
+    },
+    {
+        "node_id": "generate_file_summaries",
+        "node_type": "tool",
+        "config": {
+            "tool_name": "llm_summarization_tool",
+            "input": {
+                "action": "hierarchical_summary",
+                "file_summaries": "{parse_all_files.result.summaries}",
+                "use_mock": False
+            }
+        },
+        "dependencies": ["parse_all_files"]
+    }
+])
+
+# Static part of the DAG parameters; output_path and template_name defaults are filled per DAG
+_PARAMETERS_JSON = json.dumps({
+    "codebase_path": {
+        "description": "Path to the codebase to document",
+        "required": True,
+        "type": "string",
+        "example": "/path/to/project"
+    },
+    "output_path": {
+        "description": "Path to write final documentation",
+        "required": False,
+        "type": "string"
+    },
+    "template_name": {
+        "description": "Template to use for documentation structure",
+        "required": False,
+        "type": "string"
+    },
+    "metadata": {
+        "description": "Project metadata (name, version, authors, etc.)",
+        "required": False,
+        "type": "object",
+        "default": {
+            "doc_id": "AUTO-GENERATED",
+            "model_name": "Unknown Model",
+            "doc_version": "1.0",
+            "status": "Draft",
+            "publication_date": "AUTO"
+        }
+    }
+})
+
+
+def _json_loads(data) -> Any:
+    """Parse JSON from str or bytes with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+@functools.lru_cache(maxsize=64)
+def _load_template_cached(template_path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a template file; mtime_ns is part of the key so edited files are re-read"""
+    with open(template_path, 'rb') as f:
+        return _json_loads(f.read())
+
 
 class DynamicDAGGenerator:
     """Generate DAGs dynamically from documentation templates"""
     
     def __init__(self, templates_dir: str = 'data/templates'):
         self.templates_dir = templates_dir
+        # Generated DAGs by (template_name, dag_id), stored serialized as (template mtime_ns, dag)
+        self._dag_cache: Dict[Tuple[str, Optional[str]], Tuple[int, bytes]] = {}
     
     def generate_documentation_dag(self, template_name: str, dag_id: str = None) -> Dict[str, Any]:
         """
         Generate a full documentation DAG from a template
         
+        Repeat calls with the same arguments return a fresh copy of the cached
+        DAG until the template file changes.
+        
         Args:
             template_name: Name of template file (without .json)
             dag_id: Optional DAG ID (defaults to template_name + "_dag")
@@ -28,6 +146,24 @@ class DynamicDAGGenerator:
         Returns:
             Complete DAG configuration dictionary
         """
+        template_path = os.path.join(self.templates_dir, f"{template_name}.json")
+        try:
+            mtime_ns = os.stat(template_path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        
+        key = (template_name, dag_id)
+        cached = self._dag_cache.get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            return _json_loads(cached[1])
+        
+        dag = self._build_documentation_dag(template_name, dag_id)
+        if mtime_ns is not None:
+            self._dag_cache[key] = (mtime_ns, _json_dumps(dag))
+        return dag
+    
+    def _build_documentation_dag(self, template_name: str, dag_id: str = None) -> Dict[str, Any]:
+        """Generate a documentation DAG from a template without consulting the cache"""
         # Load template
         template = self._load_template(template_name)
         
@@ -38,76 +174,54 @@ class DynamicDAGGenerator:
         if not dag_id:
             dag_id = f"{template_name}_generated_dag"
         
-        # Extract H1 sections (top-level sections only)
-        h1_sections = self._extract_h1_sections(template)
+        # Section drafting nodes are built straight from the H1 (top-level)
+        # section generator, so no intermediate section list is materialized
+        report = []
+        section_nodes, section_node_ids, sections_mapping = self._create_section_nodes(
+            self._report_sections(self._iter_h1_sections(template), report)
+        )
         
-        print(f"[DynamicDAGGenerator] Found {len(h1_sections)} H1 sections in template")
-        for section in h1_sections:
-            print(f"  - {section['id']}: {section['title']}")
+        # If no H1 sections found, use all sections
+        if not section_nodes:
+            print("[WARNING] No H1 sections identified, using all sections")
+            section_nodes, section_node_ids, sections_mapping = self._create_section_nodes(
+                self._report_sections(template.get('sections', []), report)
+            )
+        
+        print(f"[DynamicDAGGenerator] Found {len(section_node_ids)} H1 sections in template")
+        if report:
+            print("\n".join(report))
+        
+        # DAG parameters; only the defaults of output_path and template_name vary
+        parameters = _json_loads(_PARAMETERS_JSON)
+        parameters["output_path"]["default"] = f"/tmp/abhikarta_{dag_id}_output.md"
+        parameters["template_name"]["default"] = template_name
+        
+        # Fixed preprocessing nodes
+        preprocessing_nodes = self._create_preprocessing_nodes()
+        
+        # Assembly and output nodes
+        assembly_nodes = self._create_assembly_nodes(sections_mapping, section_node_ids)
         
         # Build DAG structure
-        dag = {
+        return {
             "dag_id": dag_id,
             "name": f"Dynamic {template['name']}",
             "description": f"Auto-generated from template: {template['name']}. Adapts to template changes automatically.",
-            "nodes": [],
+            "nodes": [*preprocessing_nodes, *section_nodes, *assembly_nodes],
             "start_nodes": ["scan_codebase"],
-            "parameters": {
-                "codebase_path": {
-                    "description": "Path to the codebase to document",
-                    "required": True,
-                    "type": "string",
-                    "example": "/path/to/project"
-                },
-                "output_path": {
-                    "description": "Path to write final documentation",
-                    "required": False,
-                    "type": "string",
-                    "default": f"/tmp/abhikarta_{dag_id}_output.md"
-                },
-                "template_name": {
-                    "description": "Template to use for documentation structure",
-                    "required": False,
-                    "type": "string",
-                    "default": template_name
-                },
-                "metadata": {
-                    "description": "Project metadata (name, version, authors, etc.)",
-                    "required": False,
-                    "type": "object",
-                    "default": {
-                        "doc_id": "AUTO-GENERATED",
-                        "model_name": "Unknown Model",
-                        "doc_version": "1.0",
-                        "status": "Draft",
-                        "publication_date": "AUTO"
-                    }
-                }
-            }
+            "parameters": parameters
         }
-        
-        # Add fixed preprocessing nodes
-        dag["nodes"].extend(self._create_preprocessing_nodes())
-        
-        # Dynamically create section drafting nodes
-        section_nodes = self._create_section_nodes(h1_sections)
-        dag["nodes"].extend(section_nodes)
-        
-        # Add assembly and output nodes
-        section_node_ids = [f"draft_{section['id']}" for section in h1_sections]
-        dag["nodes"].extend(self._create_assembly_nodes(h1_sections, section_node_ids))
-        
-        return dag
     
     def _load_template(self, template_name: str) -> Dict[str, Any]:
-        """Load template from file"""
+        """Load template from file (a shared cached copy; do not modify)"""
         template_path = os.path.join(self.templates_dir, f"{template_name}.json")
         
-        if not os.path.exists(template_path):
+        # One stat both checks existence and keys the cache
+        try:
+            return _load_template_cached(template_path, os.stat(template_path).st_mtime_ns)
+        except FileNotFoundError:
             return None
-        
-        with open(template_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
     
     def _extract_h1_sections(self, template: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -122,88 +236,66 @@ class DynamicDAGGenerator:
             template: Template dictionary
             
         Returns:
-            List of H1 section definitions
+            List of H1 section definitions (all sections if none qualify)
+        """
+        h1_sections = list(self._iter_h1_sections(template))
+        
+        # If no H1 sections found, use all sections
+        if not h1_sections:
+            print("[WARNING] No H1 sections identified, using all sections")
+            h1_sections = template.get('sections', [])
+        
+        return h1_sections
+    
+    def _iter_h1_sections(self, template: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
         """
-        h1_sections = []
+        Yield the H1 sections of a template in order, without the all-sections fallback
         
+        Args:
+            template: Template dictionary
+            
+        Yields:
+            H1 section definitions
+        """
         for section in template.get('sections', []):
             # Check if this is a top-level section
             # Criteria: Has a numbered title like "1. Introduction" or is executive_summary/conclusion
-            title = section.get('title', '')
-            section_id = section.get('id', '')
-            
-            # Pattern: starts with number, or is special section
+            # Pattern: leaf section, special section, or starts with number
+            # (cheapest checks first; each field is read only if the checks before it fail)
             is_h1 = (
-                re.match(r'^\d+\.', title) or  # Starts with "1." or "2." etc.
-                section_id in ['executive_summary', 'conclusion', 'introduction'] or
-                not section.get('subsections')  # No subsections = leaf section = H1
+                not section.get('subsections') or  # No subsections = leaf section = H1
+                section.get('id', '') in _SPECIAL_IDS or
+                _H1_NUM_RE.match(section.get('title', ''))  # Starts with "1." or "2." etc.
             )
             
             if is_h1:
-                h1_sections.append(section)
-        
-        # If no H1 sections found, use all sections
-        if not h1_sections:
-            print("[WARNING] No H1 sections identified, using all sections")
-            h1_sections = template.get('sections', [])
-        
-        return h1_sections
+                yield section
+    
+    @staticmethod
+    def _report_sections(sections: Iterable[Dict[str, Any]], report: List[str]) -> Iterator[Dict[str, Any]]:
+        """Pass sections through, appending an "id: title" report line for each"""
+        for section in sections:
+            report.append(f"  - {section['id']}: {section['title']}")
+            yield section
     
     def _create_preprocessing_nodes(self) -> List[Dict[str, Any]]:
         """Create fixed preprocessing nodes (scan, parse, summarize)"""
-        return [
-            {
-                "node_id": "scan_codebase",
-                "node_type": "tool",
-                "config": {
-                    "tool_name": "filesystem_tool",
-                    "input": {
-                        "action": "list_directory",
-                        "path": "{codebase_path}",
-                        "extensions": [".py", ".js", ".ts", ".java", ".go", ".md", ".json"],
-                        "recursive": True
-                    }
-                },
-                "dependencies": []
-            },
-            {
-                "node_id": "parse_all_files",
-                "node_type": "tool",
-                "config": {
-                    "tool_name": "code_parser_tool",
-                    "input": {
-                        "action": "analyze_structure",
-                        "files": "{scan_codebase.result.files}"
-                    }
-                },
-                "dependencies": ["scan_codebase"]
-            },
-            {
-                "node_id": "generate_file_summaries",
-                "node_type": "tool",
-                "config": {
-                    "tool_name": "llm_summarization_tool",
-                    "input": {
-                        "action": "hierarchical_summary",
-                        "file_summaries": "{parse_all_files.result.summaries}",
-                        "use_mock": False
-                    }
-                },
-                "dependencies": ["parse_all_files"]
-            }
-        ]
+        return _json_loads(_PREPROCESSING_NODES_JSON)
     
-    def _create_section_nodes(self, sections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _create_section_nodes(self, sections: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str], Dict[str, str]]:
         """
         Create section drafting nodes dynamically
         
         Args:
-            sections: List of H1 section definitions from template
+            sections: H1 section definitions from template (any iterable, consumed once)
             
         Returns:
-            List of DAG node configurations
+            Tuple of (DAG node configurations, their node IDs, section ID -> node
+            result reference for assembly)
         """
         nodes = []
+        node_ids = []
+        sections_mapping = {}
         
         for section in sections:
             section_id = section['id']
@@ -216,7 +308,7 @@ class DynamicDAGGenerator:
             }
             
             # Add file summaries for implementation-heavy sections
-            if section_id in ['implementation', 'methodology', 'data']:
+            if section_id in _IMPL_SECTIONS:
                 context["file_summaries"] = "{parse_all_files.result.summaries}"
             
             node = {
@@ -236,28 +328,23 @@ class DynamicDAGGenerator:
             }
             
             nodes.append(node)
+            node_ids.append(node_id)
+            sections_mapping[section_id] = f"{{{node_id}.result}}"
         
-        return nodes
+        return nodes, node_ids, sections_mapping
     
-    def _create_assembly_nodes(self, sections: List[Dict[str, Any]], 
+    def _create_assembly_nodes(self, sections_mapping: Dict[str, str], 
                                section_node_ids: List[str]) -> List[Dict[str, Any]]:
         """
         Create document assembly and output nodes
         
         Args:
-            sections: List of H1 sections
+            sections_mapping: Section ID -> section node result reference
             section_node_ids: List of section node IDs that were created
             
         Returns:
             List of assembly and output node configurations
         """
-        # Build sections mapping for assembly
-        sections_mapping = {}
-        for section in sections:
-            section_id = section['id']
-            node_id = f"draft_{section_id}"
-            sections_mapping[section_id] = f"{{{node_id}.result}}"
-        
         return [
             {
                 "node_id": "assemble_document",
@@ -291,8 +378,19 @@ class DynamicDAGGenerator:
     
     def save_dag(self, dag: Dict[str, Any], output_path: str):
         """Save generated DAG to file"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(dag, f, indent=2)
+        if orjson is not None:
+            data = orjson.dumps(dag, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(dag, indent=2).encode('utf-8')
+        
+        # One buffer straight to the fd (os.write may be partial, so loop until done)
+        fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
         
         print(f"[DynamicDAGGenerator] DAG saved to: {output_path}")
 
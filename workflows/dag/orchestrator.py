@@ -7,17 +7,37 @@ Executes DAG-based workflows with support for parallel execution and HITL
 
 import uuid
 import json
+import time
+import queue
+import atexit
+import logging
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Set
-from threading import Thread, Lock
+from typing import Dict, Any, Optional, List, Set, Tuple
+from threading import Thread, Lock, Event
 from graph.graph import Graph, Node, NodeStatus
 from db.database import get_db
 from agents.agent_registry import AgentRegistry
 from tools.tool_registry import ToolRegistry
 
+logger = logging.getLogger(__name__)
+
 
 class WorkflowOrchestrator:
-    """Orchestrates workflow execution"""
+    """
+    Orchestrates workflow execution
+    
+    Node status, workflow status and event writes are queued and committed by
+    one daemon thread in batches, so node execution does not wait on a SQLite
+    commit per write. Readers that query the database directly (the workflow
+    DB handlers, run_model_summary_dag.py's status polling) may therefore see
+    rows up to WRITE_BATCH_WINDOW seconds stale; call flush() before reading
+    state back when that matters. close() stops the writer thread; it is also
+    called at interpreter exit.
+    """
+    
+    # A batch is committed once it holds this many writes or is this many seconds old
+    WRITE_BATCH_SIZE = 256
+    WRITE_BATCH_WINDOW = 0.05
     
     def __init__(self):
         self.agent_registry = AgentRegistry()
@@ -25,14 +45,18 @@ class WorkflowOrchestrator:
         self.db = get_db()
         self._active_workflows: Dict[str, Graph] = {}
         self._lock = Lock()
+        self._write_q: "queue.Queue" = queue.Queue()
+        self._writer: Optional[Thread] = Thread(target=self._db_writer_loop, name='workflow-db-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
     
     def start_workflow(self, dag_id: str, session_id: str, user_id: str, 
                        graph: Graph) -> str:
         """Start a new workflow execution"""
         workflow_id = str(uuid.uuid4())
         
-        # Save workflow to database
-        self.db.insert('workflows', {
+        # Save workflow and its nodes to database in one transaction
+        workflow_rows = [('workflows', {
             'workflow_id': workflow_id,
             'dag_id': dag_id,
             'session_id': session_id,
@@ -43,11 +67,9 @@ class WorkflowOrchestrator:
             'started_at': datetime.now().isoformat(),
             'created_by': user_id,
             'graph_json': graph.to_json()
-        })
-        
-        # Save workflow nodes
-        for node_id, node in graph.nodes.items():
-            self.db.insert('workflow_nodes', {
+        })]
+        workflow_rows.extend(
+            ('workflow_nodes', {
                 'workflow_id': workflow_id,
                 'node_id': node_id,
                 'node_type': node.node_type,
@@ -55,6 +77,9 @@ class WorkflowOrchestrator:
                 'status': node.status.value,
                 'config': json.dumps(node.config)
             })
+            for node_id, node in graph.nodes.items()
+        )
+        self.db.write_batch(workflow_rows)
         
         # Log event
         self._log_workflow_event(workflow_id, 'workflow_started', {
@@ -118,6 +143,7 @@ class WorkflowOrchestrator:
         
         finally:
             # Remove from active workflows if completed or failed
+            self.flush()
             status = self.db.fetchone(
                 "SELECT status FROM workflows WHERE workflow_id = ?",
                 (workflow_id,)
@@ -296,6 +322,9 @@ class WorkflowOrchestrator:
             'node_id': node.node_id,
             'request_id': request_id
         })
+        
+        # Make the waiting state visible before anyone responds to the request
+        self.flush()
     
     def approve_hitl(self, workflow_id: str, request_id: str, user_id: str, 
                      response: str = 'approved') -> bool:
@@ -334,6 +363,7 @@ class WorkflowOrchestrator:
             'request_id': request_id,
             'user_id': user_id
         })
+        self.flush()
         
         # Resume workflow execution
         with self._lock:
@@ -375,12 +405,13 @@ class WorkflowOrchestrator:
             'user_id': user_id,
             'reason': reason
         })
+        self.flush()
         
         return True
     
     def _complete_workflow(self, workflow_id: str, graph: Graph) -> None:
         """Mark workflow as completed"""
-        self.db.update(
+        self._queue_update(
             'workflows',
             {
                 'status': 'completed',
@@ -395,7 +426,7 @@ class WorkflowOrchestrator:
     
     def _fail_workflow(self, workflow_id: str, error: str) -> None:
         """Mark workflow as failed"""
-        self.db.update(
+        self._queue_update(
             'workflows',
             {
                 'status': 'failed',
@@ -424,7 +455,7 @@ class WorkflowOrchestrator:
         if error:
             update_data['error'] = error
         
-        self.db.update(
+        self._queue_update(
             'workflow_nodes',
             update_data,
             'workflow_id = ? AND node_id = ?',
@@ -434,15 +465,131 @@ class WorkflowOrchestrator:
     def _log_workflow_event(self, workflow_id: str, event_type: str, 
                            event_data: Dict[str, Any]) -> None:
         """Log workflow event"""
-        self.db.insert('workflow_events', {
+        self._queue_write(('insert', 'workflow_events', {
             'workflow_id': workflow_id,
             'event_type': event_type,
             'event_data': json.dumps(event_data),
             'created_at': datetime.now().isoformat()
-        })
+        }))
+    
+    def _queue_update(self, table: str, data: Dict[str, Any], where: str, where_params: Tuple) -> None:
+        """Queue a row update for the database writer thread"""
+        self._queue_write(('update', table, data, where, where_params))
+    
+    def _queue_write(self, item: Tuple) -> None:
+        """Queue a write, or apply it right away once the writer has been closed"""
+        if self._writer is None:
+            self._apply_writes_individually(*self._collect_writes([item]))
+        else:
+            self._write_q.put(item)
+    
+    def flush(self) -> None:
+        """Block until every write queued before this call has been committed"""
+        if self._writer is None:
+            return
+        done = Event()
+        # Also ends the writer's batch window, so the commit happens right away
+        self._write_q.put(('flush', done))
+        done.wait()
+    
+    def close(self) -> None:
+        """Commit pending writes and stop the writer thread; later writes are applied directly"""
+        writer = self._writer
+        if writer is None:
+            return
+        self._write_q.put(('stop', None))
+        writer.join()
+        self._writer = None
+        atexit.unregister(self.close)
+        
+        # Writes or flushes queued by other threads while the writer stopped
+        leftover = []
+        while True:
+            try:
+                leftover.append(self._write_q.get_nowait())
+            except queue.Empty:
+                break
+        self._apply_writes_individually(*self._collect_writes(leftover))
+        for item in leftover:
+            if item[0] == 'flush':
+                item[1].set()
+    
+    def _db_writer_loop(self) -> None:
+        """Commit queued writes in batches, one transaction per batch"""
+        write_q = self._write_q
+        while True:
+            batch = [write_q.get()]
+            deadline = time.monotonic() + self.WRITE_BATCH_WINDOW
+            while batch[-1][0] not in ('flush', 'stop') and len(batch) < self.WRITE_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(write_q.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            inserts, updates = self._collect_writes(batch)
+            try:
+                if inserts or updates:
+                    self.db.write_batch(inserts, updates)
+            except Exception as e:
+                logger.warning("Batched commit of %d workflow writes failed (%s), writing rows one at a time",
+                               len(inserts) + len(updates), e)
+                self._apply_writes_individually(inserts, updates)
+            finally:
+                # Everything queued before each flush request is now written
+                for item in batch:
+                    if item[0] == 'flush':
+                        item[1].set()
+            if batch[-1][0] == 'stop':
+                return
+    
+    def _collect_writes(self, batch: List[Tuple]) -> Tuple[List[Tuple[str, Dict[str, Any]]], List[Tuple[str, Dict[str, Any], str, Tuple]]]:
+        """
+        Split a batch of queued writes into inserts and updates
+        
+        Updates to the same row are merged, so each row is written once with its
+        latest values.
+        
+        Returns:
+            Tuple of ((table, row) inserts, (table, data, where, where_params) updates)
+        """
+        inserts = []
+        updates: Dict[Tuple[str, str, Tuple], Dict[str, Any]] = {}
+        for item in batch:
+            if item[0] == 'insert':
+                inserts.append((item[1], item[2]))
+            elif item[0] == 'update':
+                _, table, data, where, where_params = item
+                row = updates.get((table, where, where_params))
+                if row is None:
+                    updates[(table, where, where_params)] = dict(data)
+                else:
+                    row.update(data)
+        
+        return inserts, [
+            (table, data, where, where_params)
+            for (table, where, where_params), data in updates.items()
+        ]
+    
+    def _apply_writes_individually(self, inserts: List[Tuple[str, Dict[str, Any]]],
+                                   updates: List[Tuple[str, Dict[str, Any], str, Tuple]]) -> None:
+        """Write rows one by one after a failed batch, so one bad row does not lose the rest"""
+        for table, row in inserts:
+            try:
+                self.db.insert(table, row)
+            except Exception as e:
+                logger.error("Failed to insert into %s: %s", table, e)
+        for table, data, where, where_params in updates:
+            try:
+                self.db.update(table, data, where, where_params)
+            except Exception as e:
+                logger.error("Failed to update %s where %s %s: %s", table, where, where_params, e)
     
     def get_workflow_status(self, workflow_id: str) -> Optional[Dict[str, Any]]:
         """Get workflow status"""
+        self.flush()
         workflow = self.db.fetchone(
             "SELECT * FROM workflows WHERE workflow_id = ?",
             (workflow_id,)